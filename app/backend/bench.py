@@ -0,0 +1,380 @@
+"""
+CondoOS - Benchmark da API
+Dirige main.app diretamente via ASGI (sem rede) ou, opcionalmente, por socket
+real com uvicorn + h11 em localhost, e relata vazão e p50/p95/p99 por endpoint
+para diferentes tamanhos de base.
+
+Uso:
+    python bench.py --sizes 1k,10k,100k,1M
+    python bench.py --sizes 10k --scenarios resident_polling --json resultado.json
+    python bench.py --sizes 10k --baseline resultado.json --tolerance 0.2
+"""
+
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+import click
+
+# main.py usa diretórios relativos (data/, uploads/); o benchmark roda isolado
+LAUNCH_DIR = os.getcwd()
+os.chdir(tempfile.mkdtemp(prefix="condoos-bench-"))
+# Todos os clientes simulados compartilham poucos tokens e o mesmo IP
+os.environ.setdefault("CONDOOS_RATE_LIMIT", "0")
+
+import main  # noqa: E402
+
+ADMIN = {"Authorization": "Bearer token_1"}
+SINDICO = {"Authorization": "Bearer token_2"}
+MORADOR = {"Authorization": "Bearer token_3"}
+
+# JPEG mínimo para o cenário de upload de fotos
+PHOTO_BYTES = bytes.fromhex("ffd8ffe000104a46494600010100000100010000ffd9")
+
+# ==================== CLIENTES ====================
+
+class AsgiClient:
+    """Envia requisições direto para a aplicação ASGI, sem passar pela rede"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method: str, path: str, headers: dict = None, body: bytes = b"", query: str = "") -> Tuple[int, bytes]:
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "raw_path": path.encode(),
+            "query_string": query.encode(),
+            "root_path": "",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in (headers or {}).items()],
+            "client": ("127.0.0.1", 50000),
+            "server": ("bench", 80),
+        }
+        request_sent = False
+        response_complete = asyncio.Event()
+        response = {"status": 0, "body": []}
+
+        async def receive():
+            nonlocal request_sent
+            if not request_sent:
+                request_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["body"].append(message.get("body", b""))
+                if not message.get("more_body", False):
+                    response_complete.set()
+
+        await self.app(scope, receive, send)
+        return response["status"], b"".join(response["body"])
+
+class SocketClient:
+    """Cliente HTTP/1.1 com keep-alive sobre h11, uma conexão por worker"""
+
+    def __init__(self, host: str, port: int):
+        self.host = host
+        self.port = port
+        self._idle: List[tuple] = []
+
+    async def _connection(self):
+        import h11
+        if self._idle:
+            return self._idle.pop()
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        return reader, writer, h11.Connection(h11.CLIENT)
+
+    async def request(self, method: str, path: str, headers: dict = None, body: bytes = b"", query: str = "") -> Tuple[int, bytes]:
+        import h11
+        reader, writer, conn = await self._connection()
+        target = path + (f"?{query}" if query else "")
+        request_headers = [("Host", f"{self.host}:{self.port}"), ("Content-Length", str(len(body)))]
+        request_headers += list((headers or {}).items())
+        data = conn.send(h11.Request(method=method, target=target, headers=request_headers))
+        if body:
+            data += conn.send(h11.Data(data=body))
+        data += conn.send(h11.EndOfMessage())
+        writer.write(data)
+        await writer.drain()
+
+        status, chunks = 0, []
+        while True:
+            event = conn.next_event()
+            if event is h11.NEED_DATA:
+                conn.receive_data(await reader.read(65536))
+            elif isinstance(event, h11.Response):
+                status = event.status_code
+            elif isinstance(event, h11.Data):
+                chunks.append(bytes(event.data))
+            elif isinstance(event, (h11.EndOfMessage, h11.ConnectionClosed)):
+                break
+        conn.start_next_cycle()
+        self._idle.append((reader, writer, conn))
+        return status, b"".join(chunks)
+
+    async def close(self):
+        for _, writer, _ in self._idle:
+            writer.close()
+        self._idle.clear()
+
+async def start_uvicorn(app) -> Tuple[object, asyncio.Task, int]:
+    """Sobe o uvicorn no mesmo loop, numa porta livre de localhost"""
+    import uvicorn
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"))
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    return server, task, port
+
+# ==================== BASE SINTÉTICA ====================
+
+def load_dataset(size: int, seed: int = 42):
+    """Substitui o conteúdo de main.db por `size` ordens sintéticas"""
+    main.db.load()
+    rng = random.Random(seed)
+    now = datetime.now()
+    requesters = [u for u in main.db.users if u.role == main.UserRole.MORADOR]
+    orders = []
+    for i in range(size):
+        created_at = now - timedelta(minutes=size - i)
+        status = rng.choices(list(main.OrderStatus), weights=[30, 20, 40, 10])[0]
+        requester = rng.choice(requesters)
+        orders.append(main.Order(
+            id=main.new_id(created_at),
+            title=f"Ordem {i}",
+            description=f"Descrição sintética da ordem {i}",
+            category=rng.choice(list(main.Category)),
+            priority=rng.choice(list(main.Priority)),
+            status=status,
+            requester_id=requester.id,
+            requester_name=requester.name,
+            apartment=requester.apartment,
+            created_at=created_at,
+            updated_at=created_at,
+            completed_at=created_at + timedelta(hours=rng.randint(1, 72)) if status == main.OrderStatus.CONCLUIDA else None,
+        ))
+    main.db.orders = orders
+    main.db.comments = []
+    main.db.notifications = []
+    main.db.rollups.rebuild(orders)
+    main.db._build_indexes()
+
+# ==================== CENÁRIOS ====================
+
+def _period_query() -> str:
+    end = datetime.now()
+    start = end - timedelta(days=30)
+    return f"start_date={start.isoformat()}&end_date={end.isoformat()}"
+
+async def resident_polling(client, record):
+    """Morador no PWA: contagem de não lidas, notificações e suas ordens"""
+    for label, path in (
+        ("GET /api/notifications/unread-count", "/api/notifications/unread-count"),
+        ("GET /api/notifications", "/api/notifications"),
+        ("GET /api/orders (morador)", "/api/orders"),
+    ):
+        await record(label, client.request("GET", path, MORADOR))
+
+async def sindico_dashboard(client, record):
+    """Painel do síndico: estatísticas, pendências e série temporal"""
+    await record("GET /api/reports/stats", client.request("GET", "/api/reports/stats", SINDICO))
+    await record("GET /api/orders?status=pendente", client.request("GET", "/api/orders", SINDICO, query="status=pendente"))
+    await record("GET /api/reports/timeseries", client.request("GET", "/api/reports/timeseries", SINDICO, query=_period_query()))
+
+async def order_creation_burst(client, record):
+    """Rajada de criação de ordens"""
+    body = json.dumps({
+        "title": "Vazamento no corredor",
+        "description": "Água escorrendo perto do elevador",
+        "category": "hidraulica",
+        "priority": "alta",
+    }).encode()
+    headers = {**MORADOR, "Content-Type": "application/json"}
+    await record("POST /api/orders", client.request("POST", "/api/orders", headers, body))
+
+async def photo_uploads(client, record):
+    """Upload de foto em uma ordem existente"""
+    order = main.db.orders[-1]
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\n"
+        'Content-Disposition: form-data; name="file"; filename="foto.jpg"\r\n'
+        "Content-Type: image/jpeg\r\n\r\n"
+    ).encode() + PHOTO_BYTES + f"\r\n--{boundary}--\r\n".encode()
+    headers = {**ADMIN, "Content-Type": f"multipart/form-data; boundary={boundary}"}
+    await record("POST /api/orders/{id}/photos", client.request("POST", f"/api/orders/{order.id}/photos", headers, body))
+
+async def order_listing(client, record):
+    """Listagem de ordens do último mês montada a partir do cache de JSON por ordem"""
+    await record("GET /api/orders (cache JSON)", client.request("GET", "/api/orders", SINDICO, query=_period_query()))
+
+async def order_listing_uncached(client, record):
+    """Mesma listagem pelo caminho do response_model (validação e codificação por ordem)"""
+    await record("GET /api/orders (response_model)", client.request("GET", "/api/orders", SINDICO, query=_period_query()))
+
+SCENARIOS = {
+    "resident_polling": resident_polling,
+    "sindico_dashboard": sindico_dashboard,
+    "order_creation_burst": order_creation_burst,
+    "photo_uploads": photo_uploads,
+    "order_listing": order_listing,
+    "order_listing_uncached": order_listing_uncached,
+}
+# Cenários que rodam com o cache de JSON da listagem desligado
+UNCACHED_SCENARIOS = {"order_listing_uncached"}
+
+# ==================== EXECUÇÃO ====================
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(int(round(pct / 100 * (len(sorted_values) - 1))), len(sorted_values) - 1)
+    return sorted_values[index]
+
+async def run_scenario(client, scenario, iterations: int, concurrency: int) -> Dict[str, dict]:
+    """Executa o cenário `iterations` vezes com `concurrency` workers"""
+    latencies: Dict[str, List[float]] = {}
+    errors: Dict[str, int] = {}
+
+    async def record(label, request):
+        start = time.perf_counter()
+        status, _ = await request
+        latencies.setdefault(label, []).append(time.perf_counter() - start)
+        if status >= 400:
+            errors[label] = errors.get(label, 0) + 1
+
+    remaining = iter(range(iterations))
+
+    async def worker():
+        for _ in remaining:
+            await scenario(client, record)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    results = {}
+    for label, values in latencies.items():
+        values.sort()
+        results[label] = {
+            "requests": len(values),
+            "errors": errors.get(label, 0),
+            "throughput_rps": round(len(values) / elapsed, 1),
+            "p50_ms": round(_percentile(values, 50) * 1000, 3),
+            "p95_ms": round(_percentile(values, 95) * 1000, 3),
+            "p99_ms": round(_percentile(values, 99) * 1000, 3),
+            "mean_ms": round(statistics.fmean(values) * 1000, 3),
+        }
+    return results
+
+def _parse_size(value: str) -> int:
+    value = value.strip().lower()
+    multiplier = {"k": 1_000, "m": 1_000_000}.get(value[-1], 1)
+    return int(float(value.rstrip("km")) * multiplier)
+
+def print_report(size: int, scenario: str, results: Dict[str, dict]):
+    print(f"\n[{size} ordens] {scenario}")
+    print(f"  {'endpoint':<40} {'req':>6} {'err':>5} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for label, r in results.items():
+        print(
+            f"  {label:<40} {r['requests']:>6} {r['errors']:>5} {r['throughput_rps']:>9} "
+            f"{r['p50_ms']:>9} {r['p95_ms']:>9} {r['p99_ms']:>9}"
+        )
+
+def find_regressions(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Endpoints cujo p95 piorou mais que a tolerância em relação à linha de base"""
+    regressions = []
+    for size, scenarios in report.items():
+        for scenario, results in scenarios.items():
+            for label, r in results.items():
+                base = baseline.get(size, {}).get(scenario, {}).get(label)
+                if base and base["p95_ms"] > 0 and r["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+                    regressions.append(
+                        f"{size} / {scenario} / {label}: p95 {base['p95_ms']} -> {r['p95_ms']} ms"
+                    )
+    return regressions
+
+async def run_benchmark(sizes, scenarios, iterations, concurrency, use_socket) -> dict:
+    report = {}
+    cache_size = main.ORDER_JSON_CACHE_SIZE
+    server = task = None
+    if use_socket:
+        server, task, port = await start_uvicorn(main.app)
+        client = SocketClient("127.0.0.1", port)
+    else:
+        client = AsgiClient(main.app)
+    try:
+        for size in sizes:
+            load_dataset(size)
+            report[str(size)] = {}
+            for name in scenarios:
+                main.ORDER_JSON_CACHE_SIZE = 0 if name in UNCACHED_SCENARIOS else cache_size
+                results = await run_scenario(client, SCENARIOS[name], iterations, concurrency)
+                report[str(size)][name] = results
+                print_report(size, name, results)
+    finally:
+        main.ORDER_JSON_CACHE_SIZE = cache_size
+        if use_socket:
+            await client.close()
+            server.should_exit = True
+            await task
+    return report
+
+@click.command()
+@click.option("--sizes", default="1k,10k,100k,1M", show_default=True, help="Tamanhos da base (número de ordens)")
+@click.option("--scenarios", default=",".join(SCENARIOS), show_default=True, help="Cenários a executar")
+@click.option("--iterations", default=200, show_default=True, help="Execuções de cada cenário por tamanho")
+@click.option("--concurrency", default=8, show_default=True, help="Workers concorrentes")
+@click.option("--socket", "use_socket", is_flag=True, help="Usa uvicorn + h11 em localhost em vez de ASGI direto")
+@click.option("--json", "json_path", type=click.Path(dir_okay=False), help="Grava o relatório em JSON")
+@click.option("--baseline", type=click.Path(dir_okay=False), help="Relatório anterior para comparação")
+@click.option("--tolerance", default=0.2, show_default=True, help="Piora relativa de p95 aceita contra a linha de base")
+def cli(sizes, scenarios, iterations, concurrency, use_socket, json_path, baseline, tolerance):
+    """Benchmark reprodutível da API CondoOS"""
+    scenario_names = [s.strip() for s in scenarios.split(",") if s.strip()]
+    unknown = [s for s in scenario_names if s not in SCENARIOS]
+    if unknown:
+        raise click.BadParameter(f"cenários desconhecidos: {', '.join(unknown)}", param_hint="--scenarios")
+
+    report = asyncio.run(run_benchmark(
+        [_parse_size(s) for s in sizes.split(",")],
+        scenario_names,
+        iterations,
+        concurrency,
+        use_socket,
+    ))
+
+    if json_path:
+        with open(os.path.join(LAUNCH_DIR, json_path), "w") as f:
+            json.dump(report, f, indent=2)
+    if baseline:
+        with open(os.path.join(LAUNCH_DIR, baseline), "r") as f:
+            regressions = find_regressions(report, json.load(f), tolerance)
+        if regressions:
+            print("\nRegressões de p95:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,556 @@
+"""
+CondoOS - CLI de manutenção (condoos-admin)
+Compactação, reconstrução e verificação de índices, checagem de integridade e
+exportação da base em disco, backup e restauração até uma sequência do journal.
+Deve rodar com o servidor parado (com ele no ar, o backup é POST /api/admin/backup).
+
+As checagens e a exportação leem os arquivos em streaming e em paralelo (um
+processo por coleção e por segmento do arquivo); compactação e reindexação
+usam a própria classe Database de main.py.
+
+Os comandos atuam na partição padrão (--data-dir) ou, com --condo, na partição
+de um condomínio (<data-dir>/condos/<id>); check e export sem --condo percorrem
+todas as partições.
+
+Uso:
+    python condoos_admin.py --data-dir data compact --archive-after 180 --merge-segments
+    python condoos_admin.py --data-dir data reindex
+    python condoos_admin.py --data-dir data verify
+    python condoos_admin.py --data-dir data check --uploads-dir uploads
+    python condoos_admin.py --data-dir data --condo residencial-aurora compact
+    python condoos_admin.py --data-dir data create-condo residencial-aurora --admin-email admin@aurora.com
+    python condoos_admin.py --data-dir data export --out export/ --jobs 4
+    python condoos_admin.py --data-dir data backup --out backup.tar.gz
+    python condoos_admin.py restore backup.tar.gz --target restaurado/ --to-seq 1200 --journal data/journal.jsonl
+    python condoos_admin.py startup-report
+    python condoos_admin.py openapi build --out openapi.json
+    python condoos_admin.py openapi check --artifact openapi.json
+"""
+
+import gzip
+import json
+import math
+import os
+import sys
+import tarfile
+from datetime import datetime
+from multiprocessing import Pool
+from pathlib import Path
+from typing import List, NamedTuple, Optional
+
+import click
+
+COLLECTIONS = ("users", "orders", "comments", "notifications")
+
+# ==================== LEITURA EM STREAMING ====================
+
+def iter_json_array(path: Path, chunk_size: int = 1 << 20):
+    """Percorre os itens de um array JSON em disco sem carregá-lo inteiro"""
+    decoder = json.JSONDecoder()
+    with open(path, "r") as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer:
+            return
+        if buffer[0] != "[":
+            raise ValueError(f"{path}: esperado um array JSON")
+        pos = 1
+        while True:
+            # Pula espaços e vírgulas entre itens, lendo mais quando o buffer acaba
+            while True:
+                while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                    pos += 1
+                if pos < len(buffer):
+                    break
+                buffer, pos = f.read(chunk_size), 0
+                if not buffer:
+                    raise ValueError(f"{path}: array JSON incompleto")
+            if buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                more = f.read(chunk_size)
+                if not more:
+                    raise
+                buffer, pos = buffer[pos:] + more, 0
+                continue
+            yield item
+            pos = end
+
+def iter_segment(path: Path):
+    """Percorre os registros (ordem, comentários, notificações) de um segmento do arquivo"""
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        for line in f:
+            yield json.loads(line)
+
+def _tasks(data_dir: Path) -> list:
+    tasks = [(name, data_dir / f"{name}.json") for name in COLLECTIONS if (data_dir / f"{name}.json").exists()]
+    tasks += [("segment", path) for path in sorted((data_dir / "archive").glob("segment-*.jsonl.gz"))]
+    return tasks
+
+# ==================== WORKERS (EXECUTADOS EM PROCESSOS SEPARADOS) ====================
+
+def _scan(task) -> dict:
+    """Coleta ids e referências de uma coleção ou segmento para a checagem de integridade"""
+    kind, path = task
+    result = {"kind": kind, "path": str(path), "count": 0, "duplicates": 0, "ids": set(),
+              "order_refs": set(), "user_refs": set(), "photos": set()}
+
+    def add_id(item_id):
+        if item_id in result["ids"]:
+            result["duplicates"] += 1
+        result["ids"].add(item_id)
+
+    def scan_order(order):
+        add_id(order["id"])
+        result["user_refs"].add(order["requester_id"])
+        if order.get("assigned_to"):
+            result["user_refs"].add(order["assigned_to"])
+        result["photos"].update(order.get("photos", []))
+
+    if kind == "segment":
+        for record in iter_segment(path):
+            result["count"] += 1
+            scan_order(record["order"])
+            for comment in record["comments"]:
+                result["user_refs"].add(comment["user_id"])
+            for notification in record["notifications"]:
+                result["user_refs"].add(notification["user_id"])
+        return result
+
+    for item in iter_json_array(path):
+        result["count"] += 1
+        if kind == "orders":
+            scan_order(item)
+        else:
+            add_id(item["id"])
+            if item.get("order_id"):
+                result["order_refs"].add(item["order_id"])
+            if item.get("user_id"):
+                result["user_refs"].add(item["user_id"])
+    return result
+
+def _export(task) -> tuple:
+    """Exporta uma coleção ou segmento como JSON Lines comprimido"""
+    kind, path, out_dir = task
+    if kind == "segment":
+        target = out_dir / f"archived-{Path(path).name}"
+        items = (record["order"] for record in iter_segment(path))
+    else:
+        target = out_dir / f"{kind}.jsonl.gz"
+        items = iter_json_array(path)
+    count = 0
+    with gzip.open(target, "wt", encoding="utf-8") as f:
+        for item in items:
+            f.write(json.dumps(item, ensure_ascii=False) + "\n")
+            count += 1
+    return str(target), count
+
+# ==================== COMANDOS ====================
+
+class Partition(NamedTuple):
+    """Partição escolhida na linha de comando: a padrão (condo None) ou a de um condomínio"""
+    data_dir: Path
+    condo: Optional[str] = None
+
+    @property
+    def path(self) -> Path:
+        return self.data_dir if self.condo is None else self.data_dir / "condos" / self.condo
+
+def _condo_ids(data_dir: Path) -> List[str]:
+    """Condomínios com partição em disco (diretórios iniciados por ponto estão em criação)"""
+    condos = data_dir / "condos"
+    if not condos.is_dir():
+        return []
+    return sorted(p.name for p in condos.iterdir() if p.is_dir() and not p.name.startswith("."))
+
+def _partitions(partition: Partition) -> List[Partition]:
+    """A partição escolhida com --condo ou, sem ele, a padrão e todas as de condomínio"""
+    if partition.condo is not None:
+        return [partition]
+    return [partition] + [Partition(partition.data_dir, condo) for condo in _condo_ids(partition.data_dir)]
+
+def _load_database(partition: Partition, read_only: bool = False):
+    """Importa main.py apontando para o diretório de dados e carrega a partição escolhida"""
+    os.environ["CONDOOS_DATA_DIR"] = str(partition.data_dir)
+    import main
+    db = main.Database(partition.path, partition.condo)
+    db.load(read_only=read_only)
+    return main, db
+
+def _same_counters(a, b) -> bool:
+    """Compara agregados tolerando diferenças de arredondamento nas somas de tempo"""
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(_same_counters(a[k], b[k]) for k in a)
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-6)
+    return a == b
+
+def _dir_size(path: Path) -> int:
+    return sum(p.stat().st_size for p in path.rglob("*") if p.is_file())
+
+@click.group(name="condoos-admin")
+@click.option("--data-dir", type=click.Path(file_okay=False, exists=True), default="data", show_default=True,
+              help="Diretório de dados (o mesmo de CONDOOS_DATA_DIR)")
+@click.option("--condo", help="Condomínio (partição em <data-dir>/condos/<id>); sem ele, a partição padrão")
+@click.pass_context
+def cli(ctx, data_dir, condo):
+    """Manutenção offline da base do CondoOS"""
+    data_dir = Path(data_dir)
+    # Apontar --data-dir para dentro de condos/ carregaria a partição como se fosse a padrão
+    if data_dir.resolve().parent.name == "condos":
+        raise click.BadParameter(
+            f"{data_dir} é a partição de um condomínio; use --data-dir {data_dir.parent.parent} --condo {data_dir.name}",
+            param_hint="--data-dir",
+        )
+    if condo is not None and condo not in _condo_ids(data_dir):
+        raise click.BadParameter(f"condomínio inexistente em {data_dir / 'condos'}", param_hint="--condo")
+    ctx.obj = Partition(data_dir, condo)
+
+@cli.command()
+@click.option("--archive-after", type=int, help="Arquiva ordens fechadas há mais de N dias")
+@click.option("--notifications/--no-notifications", default=True, show_default=True,
+              help="Aplica a retenção de notificações")
+@click.option("--merge-segments", is_flag=True, help="Junta os segmentos do arquivo em um só")
+@click.pass_obj
+def compact(partition, archive_after, notifications, merge_segments):
+    """Compacta a base: arquivamento, retenção de notificações, segmentos e journal"""
+    size_before = _dir_size(partition.path)
+    main, db = _load_database(partition)
+    if archive_after is not None:
+        click.echo(f"arquivamento: {db.archive_closed_orders(archive_after)}")
+    if notifications:
+        report = db.compact_notifications(main.NOTIFICATION_READ_TTL_DAYS, main.NOTIFICATION_MAX_PER_USER)
+        click.echo(f"notificações: {report}")
+    if merge_segments:
+        click.echo(f"segmentos: {db.archive.merge_segments()}")
+    db._save_data()
+    # Entradas já gravadas nos arquivos só serviam para avançar backups anteriores
+    click.echo(f"journal: {db.compact_journal()} bytes liberados")
+    size_after = _dir_size(partition.path)
+    click.echo(f"{size_before} -> {size_after} bytes ({size_before - size_after} liberados)")
+
+@cli.command()
+@click.pass_obj
+def reindex(partition):
+    """Reconstrói os agregados (rollups.json) e o manifesto do arquivo"""
+    _, db = _load_database(partition)
+    segments = db.archive.rebuild_manifest()
+    db.rollups.rebuild(db.orders)
+    for order in db.archive.iter_orders():
+        db.rollups.add(order)
+    db._save_data()
+    click.echo(f"{len(db.orders)} ordens ativas, {len(db.archive)} arquivadas em {segments} segmentos")
+
+@cli.command()
+@click.pass_obj
+def verify(partition):
+    """Confere agregados, manifesto do arquivo e índices contra os dados (sem gravar nada)"""
+    main, db = _load_database(partition, read_only=True)
+    problems = []
+
+    expected = main.Rollups()
+    expected.rebuild(db.orders)
+    for order in db.archive.iter_orders():
+        expected.add(order)
+    if not _same_counters(expected.buckets, db.rollups.buckets):
+        problems.append("rollups.json diverge das ordens (rode reindex)")
+
+    for segment in db.archive.segments:
+        path = db.archive.directory / segment["name"]
+        if not path.exists():
+            problems.append(f"segmento ausente: {segment['name']}")
+            continue
+        ids = [r["order"]["id"] for r in iter_segment(path)]
+        if ids != segment["order_ids"]:
+            problems.append(f"manifesto diverge do segmento {segment['name']} (rode reindex)")
+
+    hot_ids = [o.id for o in db.orders]
+    if len(set(hot_ids)) != len(hot_ids):
+        problems.append("ids de ordem duplicados")
+    if len(db.orders_by_created) != len(db.orders):
+        problems.append("índice por created_at incompleto")
+    keys = [o.created_at for o in db.orders_by_created.range()]
+    if keys != sorted(keys):
+        problems.append("índice por created_at fora de ordem")
+
+    for problem in problems:
+        click.echo(f"ERRO: {problem}")
+    if problems:
+        sys.exit(1)
+    click.echo("ok")
+
+@cli.command()
+@click.option("--uploads-dir", type=click.Path(file_okay=False), default="uploads", show_default=True)
+@click.option("--jobs", default=os.cpu_count(), show_default=True, help="Processos em paralelo")
+@click.pass_obj
+def check(partition, uploads_dir, jobs):
+    """Checa integridade: referências pendentes, ids duplicados e fotos órfãs"""
+    partitions = _partitions(partition)
+    tasks = [(p, task) for p in partitions for task in _tasks(p.path)]
+    with Pool(jobs) as pool:
+        results = list(pool.imap(_scan, [task for _, task in tasks]))
+
+    problems = []
+    photos = set()
+    for p in partitions:
+        # Ids e referências valem dentro de cada partição; as fotos ficam num diretório só
+        found, referenced = _check_references([r for (q, _), r in zip(tasks, results) if q == p])
+        label = "" if p.condo is None else f"condomínio {p.condo}: "
+        problems += [label + problem for problem in found]
+        photos |= referenced
+
+    uploads = Path(uploads_dir)
+    on_disk = {f"/uploads/{p.name}" for p in uploads.iterdir() if p.is_file()} if uploads.exists() else set()
+    # Com --condo as fotos dos outros condomínios pareceriam órfãs
+    orphaned = on_disk - photos if partition.condo is None else set()
+    missing = photos - on_disk
+    if orphaned:
+        problems.append(f"{len(orphaned)} fotos órfãs em {uploads} (ex.: {sorted(orphaned)[:3]})")
+    if missing:
+        problems.append(f"{len(missing)} fotos referenciadas ausentes (ex.: {sorted(missing)[:3]})")
+
+    for r in sorted(results, key=lambda r: r["path"]):
+        click.echo(f"{r['path']}: {r['count']} itens")
+    for problem in problems:
+        click.echo(f"ERRO: {problem}")
+    if problems:
+        sys.exit(1)
+    click.echo("ok")
+
+def _check_references(results: list) -> tuple:
+    """Ids duplicados e referências pendentes de uma partição, e as fotos que ela referencia"""
+    order_ids, user_ids, photos = set(), set(), set()
+    order_refs, user_refs = {}, set()
+    problems = []
+    for r in results:
+        if r["duplicates"]:
+            problems.append(f"{r['path']}: {r['duplicates']} ids duplicados")
+        if r["kind"] in ("orders", "segment"):
+            order_ids |= r["ids"]
+            photos |= r["photos"]
+        elif r["kind"] == "users":
+            user_ids |= r["ids"]
+        order_refs.setdefault(r["kind"], set()).update(r["order_refs"])
+        user_refs |= r["user_refs"]
+
+    for kind in ("comments", "notifications"):
+        dangling = order_refs.get(kind, set()) - order_ids
+        if dangling:
+            problems.append(f"{kind}: {len(dangling)} order_id sem ordem (ex.: {sorted(dangling)[:3]})")
+    dangling_users = user_refs - user_ids
+    if dangling_users:
+        problems.append(f"{len(dangling_users)} user_id sem usuário (ex.: {sorted(dangling_users)[:3]})")
+    return problems, photos
+
+@cli.command()
+@click.option("--out", type=click.Path(file_okay=False), required=True, help="Diretório de destino")
+@click.option("--jobs", default=os.cpu_count(), show_default=True, help="Processos em paralelo")
+@click.pass_obj
+def export(partition, out, jobs):
+    """Exporta coleções e ordens arquivadas como JSON Lines comprimido, em paralelo
+
+    A partição padrão vai para a raiz de --out e cada condomínio para condos/<id>.
+    """
+    tasks = []
+    for p in _partitions(partition):
+        out_dir = Path(out) if p.condo is None else Path(out) / "condos" / p.condo
+        out_dir.mkdir(parents=True, exist_ok=True)
+        tasks += [(kind, path, out_dir) for kind, path in _tasks(p.path)]
+    with Pool(jobs) as pool:
+        for target, count in pool.imap_unordered(_export, tasks):
+            click.echo(f"{target}: {count} itens")
+
+@cli.command()
+@click.option("--out", type=click.Path(dir_okay=False), required=True, help="Arquivo tar.gz de destino")
+@click.option("--uploads-dir", type=click.Path(file_okay=False), default="uploads", show_default=True)
+@click.pass_obj
+def backup(partition, out, uploads_dir):
+    """Backup (tar.gz) da base, do journal e das fotos referenciadas"""
+    os.environ["CONDOOS_UPLOAD_DIR"] = uploads_dir
+    _, db = _load_database(partition)
+    with open(out, "wb") as f:
+        meta = db.backup(f)
+    click.echo(f"{out}: sequência {meta['seq']}, {len(meta['files'])} arquivos, {meta['uploads']} fotos")
+
+@cli.command("create-condo")
+@click.argument("condo_id")
+@click.option("--admin-email", required=True, help="E-mail de login do primeiro administrador")
+@click.option("--admin-name", default="Administrador", show_default=True)
+@click.option("--admin-password", prompt=True, hide_input=True, confirmation_prompt=True)
+@click.pass_obj
+def create_condo(partition, condo_id, admin_email, admin_name, admin_password):
+    """Cria a partição de um condomínio com seu primeiro administrador"""
+    os.environ["CONDOOS_DATA_DIR"] = str(partition.data_dir)
+    import main
+    if not main.CONDO_ID_PATTERN.fullmatch(condo_id):
+        raise click.BadParameter("use até 64 letras, dígitos, '_' ou '-'", param_hint="CONDO_ID")
+    condos = partition.data_dir / "condos"
+    target = condos / condo_id
+    if target.exists():
+        raise click.ClickException(f"{target} já existe")
+
+    # Montada ao lado e renomeada no fim: com o servidor no ar, a partição
+    # nunca é vista (e carregada) sem o administrador
+    staging = condos / f".{condo_id}.tmp"
+    staging.mkdir(parents=True)
+    db = main.Database(staging, condo_id)
+    db.load()
+    admin = main.User(
+        id=main.new_id(),
+        name=admin_name,
+        email=admin_email,
+        role=main.UserRole.ADMIN,
+        created_at=datetime.now(),
+        password=admin_password,
+        condo_id=condo_id
+    )
+    db.add_user(admin)
+    db._save_data()
+    os.replace(staging, target)
+    click.echo(f"{target}: administrador {admin_email} (id {admin.id}); login com o header X-Condo-Id: {condo_id}")
+
+def _apply_journal_entry(entry: dict, collections: dict, target: Path):
+    """Reaplica uma entrada do journal sobre as coleções (idempotente)"""
+    items = collections[entry["kind"] + "s"]
+    if entry["op"] == "put":
+        for item in entry["items"]:
+            items[item["id"]] = item
+    elif entry["op"] == "delete":
+        for item_id in entry["ids"]:
+            items.pop(item_id, None)
+    elif entry["op"] == "archive":
+        # Refaz o arquivamento com o estado restaurado até aqui
+        ids = {i for i in entry["ids"] if i in collections["orders"]}
+        if not ids:
+            return
+        records = {i: {"order": collections["orders"].pop(i), "comments": [], "notifications": []} for i in ids}
+        for kind in ("comments", "notifications"):
+            for item_id, item in list(collections[kind].items()):
+                if item.get("order_id") in ids:
+                    records[item["order_id"]][kind].append(collections[kind].pop(item_id))
+        os.environ["CONDOOS_DATA_DIR"] = str(target)
+        import main
+        archive = main.Archive(target / "archive")
+        archive.load()
+        archive.append_segment(list(records.values()))
+
+@cli.command()
+@click.argument("backup_file", type=click.Path(dir_okay=False, exists=True))
+@click.option("--target", type=click.Path(file_okay=False), required=True, help="Diretório (novo ou vazio) da base restaurada")
+@click.option("--to-seq", type=int, help="Sequência do journal a atingir (padrão: a última disponível)")
+@click.option("--journal", "journal_path", type=click.Path(dir_okay=False, exists=True),
+              help="Journal com entradas posteriores ao backup (padrão: o contido no backup)")
+def restore(backup_file, target, to_seq, journal_path):
+    """Restaura um backup e reaplica o journal até uma sequência"""
+    target = Path(target)
+    if target.exists() and any(target.iterdir()):
+        raise click.ClickException(f"{target} não está vazio")
+    target.mkdir(parents=True, exist_ok=True)
+    with tarfile.open(backup_file, "r:gz") as tar:
+        tar.extractall(target, filter="data")
+    meta_path = target / "backup.json"
+    with open(meta_path, "r") as f:
+        meta = json.load(f)
+    meta_path.unlink()
+    if to_seq is not None and to_seq < meta["seq"]:
+        raise click.ClickException(f"o backup já está na sequência {meta['seq']}; use um backup anterior")
+
+    collections = {}
+    for name in COLLECTIONS:
+        path = target / f"{name}.json"
+        collections[name] = {item["id"]: item for item in iter_json_array(path)} if path.exists() else {}
+
+    journal_lines = []
+    last_seq = meta["seq"]
+    applied = 0
+    with open(journal_path or target / "journal.jsonl", "r") as f:
+        for line in f:
+            # Linha final interrompida por uma queda
+            if not line.endswith("\n"):
+                break
+            entry = json.loads(line)
+            if to_seq is not None and entry["seq"] > to_seq:
+                break
+            journal_lines.append(line)
+            if entry["seq"] > meta["seq"]:
+                if entry["seq"] != last_seq + 1:
+                    raise click.ClickException(
+                        f"o journal salta da sequência {last_seq} para {entry['seq']} "
+                        "(compactado depois do backup); use um backup mais recente"
+                    )
+                _apply_journal_entry(entry, collections, target)
+                last_seq = entry["seq"]
+                applied += 1
+
+    for name, items in collections.items():
+        with open(target / f"{name}.json", "w") as f:
+            json.dump(list(items.values()), f, default=str, indent=2)
+    with open(target / "journal.jsonl", "w") as f:
+        f.writelines(journal_lines)
+    # O histórico vai só até a sequência restaurada
+    events_path = target / "events.jsonl"
+    if events_path.exists():
+        with open(events_path, "r") as f:
+            events = [line for line in f if line.endswith("\n") and json.loads(line)["seq"] <= last_seq]
+        with open(events_path, "w") as f:
+            f.writelines(events)
+    # Os agregados (e o snapshot do histórico) são recalculados no próximo startup
+    (target / "rollups.json").unlink(missing_ok=True)
+    (target / "events.snapshot.json").unlink(missing_ok=True)
+
+    click.echo(f"backup na sequência {meta['seq']}; {applied} entradas reaplicadas; base na sequência {last_seq}")
+    if to_seq is not None and last_seq < to_seq:
+        click.echo(f"aviso: o journal termina na sequência {last_seq}")
+    if meta["uploads"]:
+        click.echo(f"fotos restauradas em {target / 'uploads'} (use CONDOOS_UPLOAD_DIR)")
+
+@cli.command("startup-report")
+@click.option("--top", default=15, show_default=True, help="Quantos módulos listar")
+def startup_report(top):
+    """Resumo de `python -X importtime` para o import de main.py"""
+    os.environ.setdefault("CONDOOS_DATA_DIR", "data")
+    import main
+    for module, ms in main.import_time_digest(top):
+        click.echo(f"{ms:>8.1f} ms  {module}")
+
+@cli.group()
+def openapi():
+    """Artefato openapi.json pré-gerado (servido com CONDOOS_OPENAPI_ARTIFACT)"""
+
+def _live_openapi() -> dict:
+    os.environ.pop("CONDOOS_OPENAPI_ARTIFACT", None)
+    os.environ.setdefault("CONDOOS_DATA_DIR", "data")
+    import main
+    # Gera sempre a partir das rotas, ignorando qualquer artefato configurado
+    return main.FastAPI.openapi(main.app)
+
+@openapi.command("build")
+@click.option("--out", type=click.Path(dir_okay=False), default="openapi.json", show_default=True)
+def openapi_build(out):
+    """Gera o openapi.json a partir das rotas atuais"""
+    schema = _live_openapi()
+    with open(out, "w") as f:
+        json.dump(schema, f, ensure_ascii=False, indent=2)
+    click.echo(f"{out}: {len(schema['paths'])} caminhos")
+
+@openapi.command("check")
+@click.option("--artifact", type=click.Path(dir_okay=False, exists=True), default="openapi.json", show_default=True)
+def openapi_check(artifact):
+    """Confere se o artefato corresponde ao schema gerado pelas rotas atuais"""
+    with open(artifact, "r") as f:
+        stored = json.load(f)
+    live = _live_openapi()
+    if stored != live:
+        missing = sorted(set(live["paths"]) - set(stored["paths"]))
+        extra = sorted(set(stored["paths"]) - set(live["paths"]))
+        click.echo(f"ERRO: {artifact} desatualizado (rode openapi build)")
+        if missing:
+            click.echo(f"  caminhos ausentes: {', '.join(missing)}")
+        if extra:
+            click.echo(f"  caminhos removidos: {', '.join(extra)}")
+        sys.exit(1)
+    click.echo("ok")
+
+if __name__ == "__main__":
+    cli()
@@ -0,0 +1,251 @@
+"""
+CondoOS - Gerador de bases sintéticas para testes de capacidade
+Gera usuários, ordens, comentários e notificações com distribuições realistas
+no mesmo formato em disco usado por Database (data/*.json). Cada coleção é
+gravada item a item, então a memória fica limitada mesmo com dezenas de
+milhões de registros.
+
+Uso:
+    python gen_dataset.py --out data --orders 100000
+    python gen_dataset.py --out bases --condos 50 --orders 20000 --residents 200
+    CONDOOS_DATA_DIR=bases python main.py  # condomínios em bases/condos/condo-XXX
+"""
+
+import json
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Optional
+
+import click
+
+# Distribuições (valores dos enums de main.py e pesos relativos)
+STATUS_WEIGHTS = {"pendente": 25, "em_andamento": 15, "concluida": 50, "cancelada": 10}
+PRIORITY_WEIGHTS = {"baixa": 30, "media": 40, "alta": 22, "urgente": 8}
+CATEGORY_WEIGHTS = {
+    "eletrica": 18,
+    "hidraulica": 22,
+    "limpeza": 15,
+    "seguranca": 10,
+    "estrutural": 8,
+    "jardinagem": 7,
+    "outros": 20,
+}
+# Horas médias até a conclusão por prioridade
+RESOLUTION_HOURS = {"baixa": 120, "media": 72, "alta": 24, "urgente": 6}
+
+TITLES = {
+    "eletrica": ["Lâmpada queimada no corredor", "Disjuntor desarmando", "Tomada sem energia"],
+    "hidraulica": ["Vazamento na garagem", "Infiltração no teto", "Descarga com defeito"],
+    "limpeza": ["Lixo acumulado na escada", "Limpeza do salão de festas", "Mancha no hall"],
+    "seguranca": ["Portão da garagem travando", "Câmera sem imagem", "Interfone mudo"],
+    "estrutural": ["Rachadura na parede", "Reboco caindo", "Piso solto na entrada"],
+    "jardinagem": ["Poda das árvores", "Grama alta no jardim", "Irrigação quebrada"],
+    "outros": ["Barulho após as 22h", "Vaga ocupada indevidamente", "Sugestão para a área comum"],
+}
+COMMENTS = [
+    "Equipe a caminho.",
+    "Peça encomendada, aguardando entrega.",
+    "Problema persiste, favor verificar novamente.",
+    "Obrigado pelo atendimento!",
+    "Verificado no local.",
+]
+
+class JsonArrayWriter:
+    """Escreve um array JSON item a item, sem manter a coleção em memória"""
+
+    def __init__(self, path: Path):
+        self.file = open(path, "w", buffering=1 << 20)
+        self.file.write("[")
+        self.count = 0
+
+    def write(self, item: dict):
+        self.file.write(",\n" if self.count else "\n")
+        self.file.write(json.dumps(item, default=str))
+        self.count += 1
+
+    def close(self):
+        self.file.write("\n]\n" if self.count else "]\n")
+        self.file.close()
+
+def _uuid7(moment: datetime, rng: random.Random) -> str:
+    """ID no formato UUIDv7 (o mesmo de new_id em main.py), reproduzível pela semente"""
+    ms = int(moment.timestamp() * 1000)
+    return str(uuid.UUID(int=(ms << 80) | (0x7 << 76) | (rng.getrandbits(12) << 64) | (0b10 << 62) | rng.getrandbits(62)))
+
+def _weighted(rng: random.Random, weights: dict) -> str:
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+def _poisson(rng: random.Random, mean: float) -> int:
+    # Algoritmo de Knuth; suficiente para médias pequenas
+    limit, k, p = math.exp(-mean), 0, 1.0
+    while True:
+        p *= rng.random()
+        if p <= limit:
+            return k
+        k += 1
+
+def generate_users(condo: int, residents: int, staff: int, now: datetime, rng: random.Random) -> list:
+    users = [
+        {"id": _uuid7(now, rng), "name": "Administrador", "email": f"admin@condo{condo}.com", "role": "admin",
+         "apartment": None, "phone": None, "created_at": now, "password": "admin123"},
+        {"id": _uuid7(now, rng), "name": f"Síndico {condo}", "email": f"sindico@condo{condo}.com", "role": "sindico",
+         "apartment": None, "phone": "(11) 99999-1111", "created_at": now, "password": "sindico123"},
+    ]
+    for i in range(staff):
+        users.append({
+            "id": _uuid7(now, rng), "name": f"Funcionário {i + 1}", "email": f"funcionario{i + 1}@condo{condo}.com",
+            "role": "funcionario", "apartment": None, "phone": None, "created_at": now, "password": "func123",
+        })
+    for i in range(residents):
+        apartment = f"{(i // 4) + 1:02d}{'ABCD'[i % 4]}"
+        users.append({
+            "id": _uuid7(now, rng), "name": f"Morador {i + 1}", "email": f"morador{i + 1}@condo{condo}.com",
+            "role": "morador", "apartment": apartment, "phone": None, "created_at": now, "password": "morador123",
+        })
+    return users
+
+def generate_condo(
+    out: Path,
+    condo: int,
+    condo_id: Optional[str],
+    orders: int,
+    residents: int,
+    staff: int,
+    comments_per_order: float,
+    days: int,
+    rng: random.Random
+) -> dict:
+    """Gera um condomínio completo em `out`, gravando cada coleção em streaming"""
+    out.mkdir(parents=True, exist_ok=True)
+    now = datetime.now()
+    start = now - timedelta(days=days)
+    span = (now - start).total_seconds()
+
+    users = generate_users(condo, residents, staff, start, rng)
+    for user in users:
+        user["condo_id"] = condo_id
+    with open(out / "users.json", "w") as f:
+        json.dump(users, f, default=str, indent=2)
+    managers = [u for u in users if u["role"] in ("admin", "sindico")]
+    workers = [u for u in users if u["role"] == "funcionario"]
+    requesters = [u for u in users if u["role"] == "morador"]
+
+    order_writer = JsonArrayWriter(out / "orders.json")
+    comment_writer = JsonArrayWriter(out / "comments.json")
+    notification_writer = JsonArrayWriter(out / "notifications.json")
+
+    def notify(user_id, title, message, order_id, created_at):
+        notification_writer.write({
+            "id": _uuid7(created_at, rng),
+            "user_id": user_id, "title": title, "message": message, "order_id": order_id,
+            # Notificações com mais de uma semana quase sempre já foram lidas
+            "read": (now - created_at).days > 7 or rng.random() < 0.3,
+            "created_at": created_at,
+        })
+
+    for i in range(orders):
+        # Ordens geradas em ordem cronológica, como seriam criadas
+        created_at = start + timedelta(seconds=span * (i + rng.random()) / orders)
+        requester = rng.choice(requesters)
+        category = _weighted(rng, CATEGORY_WEIGHTS)
+        priority = _weighted(rng, PRIORITY_WEIGHTS)
+        status = _weighted(rng, STATUS_WEIGHTS)
+        worker = rng.choice(workers) if workers and status != "pendente" else None
+
+        closed_at = None
+        if status in ("concluida", "cancelada"):
+            hours = rng.expovariate(1 / RESOLUTION_HOURS[priority])
+            closed_at = min(created_at + timedelta(hours=hours), now)
+        updated_at = closed_at or created_at
+
+        order_id = _uuid7(created_at, rng)
+        title = rng.choice(TITLES[category])
+        order_writer.write({
+            "id": order_id,
+            "title": title,
+            "description": f"{title}. Relatado pelo apartamento {requester['apartment']}.",
+            "category": category,
+            "priority": priority,
+            "status": status,
+            "requester_id": requester["id"],
+            "requester_name": requester["name"],
+            "apartment": requester["apartment"],
+            "assigned_to": worker["id"] if worker else None,
+            "assigned_name": worker["name"] if worker else None,
+            "photos": [],
+            "created_at": created_at,
+            "updated_at": updated_at,
+            "completed_at": closed_at if status == "concluida" else None,
+            "cancelled_at": closed_at if status == "cancelada" else None,
+            "estimated_completion": None,
+            "condo_id": condo_id,
+        })
+
+        for manager in managers:
+            notify(manager["id"], "Nova Ordem de Serviço",
+                   f"{requester['name']} criou uma nova OS: {title}", order_id, created_at)
+        if status != "pendente":
+            notify(requester["id"], "Atualização de OS",
+                   f"Sua ordem '{title}' foi atualizada para: {status}", order_id, updated_at)
+
+        for _ in range(_poisson(rng, comments_per_order)):
+            author = rng.choice([requester] + managers + ([worker] if worker else []))
+            is_internal = author["role"] != "morador" and rng.random() < 0.25
+            commented_at = created_at + (updated_at - created_at) * rng.random()
+            comment_writer.write({
+                "id": _uuid7(commented_at, rng),
+                "order_id": order_id,
+                "user_id": author["id"],
+                "user_name": author["name"],
+                "user_role": author["role"],
+                "content": rng.choice(COMMENTS),
+                "created_at": commented_at,
+                "is_internal": is_internal,
+            })
+            if author["id"] != requester["id"]:
+                notify(requester["id"], "Novo Comentário",
+                       f"{author['name']} comentou na ordem '{title}'", order_id, commented_at)
+
+        if (i + 1) % 100_000 == 0:
+            click.echo(f"  condomínio {condo}: {i + 1}/{orders} ordens")
+
+    for writer in (order_writer, comment_writer, notification_writer):
+        writer.close()
+    return {
+        "users": len(users),
+        "orders": order_writer.count,
+        "comments": comment_writer.count,
+        "notifications": notification_writer.count,
+    }
+
+@click.command()
+@click.option("--out", type=click.Path(file_okay=False), default="data", show_default=True, help="Diretório de saída")
+@click.option("--condos", default=1, show_default=True, help="Condomínios (com mais de um, uma partição em condos/ por condomínio)")
+@click.option("--orders", default=10_000, show_default=True, help="Ordens por condomínio")
+@click.option("--residents", default=100, show_default=True, help="Moradores por condomínio")
+@click.option("--staff", default=3, show_default=True, help="Funcionários por condomínio")
+@click.option("--comments-per-order", default=1.5, show_default=True, help="Média de comentários por ordem")
+@click.option("--days", default=365, show_default=True, help="Período coberto pelas ordens, em dias")
+@click.option("--seed", default=42, show_default=True, help="Semente do gerador (bases reproduzíveis)")
+def cli(out, condos, orders, residents, staff, comments_per_order, days, seed):
+    """Gera uma base sintética no formato de data/*.json"""
+    if residents < 1:
+        raise click.BadParameter("é preciso ao menos um morador", param_hint="--residents")
+    rng = random.Random(seed)
+    out = Path(out)
+    totals = {"users": 0, "orders": 0, "comments": 0, "notifications": 0}
+    for condo in range(1, condos + 1):
+        condo_id = None if condos == 1 else f"condo-{condo:03d}"
+        target = out if condo_id is None else out / "condos" / condo_id
+        counts = generate_condo(target, condo, condo_id, orders, residents, staff, comments_per_order, days, rng)
+        for key, value in counts.items():
+            totals[key] += value
+        click.echo(f"{target}: " + ", ".join(f"{v} {k}" for k, v in counts.items()))
+    if condos > 1:
+        click.echo("total: " + ", ".join(f"{v} {k}" for k, v in totals.items()))
+
+if __name__ == "__main__":
+    cli()
@@ -3,44 +3,117 @@ CondoOS - Sistema de Gerenciamento de Ordens de Serviço para Condomínios
 Backend FastAPI
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, Form
+import time
+_import_started = time.perf_counter()
+
+from fastapi import FastAPI, HTTPException, Depends, status, File, UploadFile, Form, BackgroundTasks, Header, Response
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import PlainTextResponse, FileResponse, JSONResponse
+from fastapi.routing import APIRoute
 from pydantic import BaseModel, Field
-from typing import Optional, List
-from datetime import datetime, timedelta
+from typing import Optional, List, Dict
+from datetime import datetime, date, timedelta
 from enum import Enum
+from contextlib import contextmanager, asynccontextmanager
+from contextvars import ContextVar
+from bisect import bisect_left, bisect_right
+from heapq import heapify, heappush, heappop
+from functools import lru_cache
+from operator import attrgetter, eq
+from array import array
 import os
+import re
 import json
+import gzip
+import io
+import hashlib
+import asyncio
+import sys
+import math
+import unicodedata
+import threading
+import traceback
 import uuid
 import shutil
+from itertools import chain, count, islice
+from collections import OrderedDict
 from pathlib import Path
 
+# Tempos de cada fase da inicialização, em ms
+startup_phases: Dict[str, float] = {"imports": round((time.perf_counter() - _import_started) * 1000, 1)}
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Inicia as tarefas de fundo com o servidor e as encerra no desligamento.
+
+    Os dados são carregados em segundo plano: o servidor já aceita conexões e
+    /api/health responde 503 até a base estar pronta.
+    """
+    sla_wakeup.bind()
+    loaded = asyncio.create_task(_load_database())
+    tasks = [
+        loaded,
+        asyncio.create_task(_notification_compaction_loop()),
+        asyncio.create_task(_event_loop_lag_loop()),
+        asyncio.create_task(loop_watchdog.run()),
+        asyncio.create_task(_rate_limit_eviction_loop()),
+        asyncio.create_task(_sla_escalation_loop(loaded)),
+    ]
+    yield
+    for task in tasks:
+        task.cancel()
+
 # Configuração do app
 app = FastAPI(
     title="CondoOS API",
     description="API para gerenciamento de ordens de serviço de condomínios",
-    version="1.0.0"
-)
-
-# CORS
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["*"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Diretórios
-UPLOAD_DIR = Path("uploads")
-UPLOAD_DIR.mkdir(exist_ok=True)
-DATA_DIR = Path("data")
-DATA_DIR.mkdir(exist_ok=True)
+UPLOAD_DIR = Path(os.environ.get("CONDOOS_UPLOAD_DIR", "uploads"))
+UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
+DATA_DIR = Path(os.environ.get("CONDOOS_DATA_DIR", "data"))
+DATA_DIR.mkdir(parents=True, exist_ok=True)
+# Uma partição (diretório com os mesmos arquivos de DATA_DIR) por condomínio
+CONDOS_DIR = DATA_DIR / "condos"
+PROFILE_DIR = DATA_DIR / "profiles"
+
+# Ordens fechadas há mais do que isso (em dias) vão para o arquivo
+ARCHIVE_AFTER_DAYS = int(os.environ.get("CONDOOS_ARCHIVE_AFTER_DAYS", "90"))
+
+# Eventos de ordens entre dois snapshots do histórico (índice + agregados)
+EVENT_SNAPSHOT_EVERY = int(os.environ.get("CONDOOS_EVENT_SNAPSHOT_EVERY", "10000"))
+
+# Retenção de notificações: lidas expiram após N dias e cada usuário guarda no máximo M
+NOTIFICATION_READ_TTL_DAYS = int(os.environ.get("CONDOOS_NOTIFICATION_READ_TTL_DAYS", "30"))
+NOTIFICATION_MAX_PER_USER = int(os.environ.get("CONDOOS_NOTIFICATION_MAX_PER_USER", "200"))
+# Intervalo da compactação automática em segundos (0 desativa)
+NOTIFICATION_COMPACTION_INTERVAL = int(os.environ.get("CONDOOS_NOTIFICATION_COMPACTION_INTERVAL", "3600"))
+
+# Perfis de requisição guardados em disco (os mais antigos são descartados)
+PROFILE_RING_SIZE = int(os.environ.get("CONDOOS_PROFILE_RING_SIZE", "20"))
+
+# Fragmentos JSON de ordens mantidos em cache para a listagem (0 desativa)
+ORDER_JSON_CACHE_SIZE = int(os.environ.get("CONDOOS_ORDER_JSON_CACHE_SIZE", "100000"))
+
+# Partições de condomínio mantidas em memória ao mesmo tempo (LRU)
+MAX_LOADED_CONDOS = int(os.environ.get("CONDOOS_MAX_LOADED_CONDOS", "64"))
+
+# Limite de requisições por usuário/IP (0 desativa)
+RATE_LIMIT_ENABLED = os.environ.get("CONDOOS_RATE_LIMIT", "1") != "0"
+
+# openapi.json pré-gerado (condoos_admin.py openapi build); vazio gera o schema sob demanda
+OPENAPI_ARTIFACT = os.environ.get("CONDOOS_OPENAPI_ARTIFACT")
+
+# Bloqueios do event loop acima disso (em ms) são registrados com a pilha (0 desativa)
+LOOP_STALL_THRESHOLD_MS = int(os.environ.get("CONDOOS_LOOP_STALL_THRESHOLD_MS", "250"))
 
 # Montar arquivos estáticos
-app.mount("/uploads", StaticFiles(directory="uploads"), name="uploads")
+app.mount("/uploads", StaticFiles(directory=UPLOAD_DIR), name="uploads")
 
 # ==================== ENUMS ====================
 
@@ -71,6 +144,40 @@ class Category(str, Enum):
     JARDINAGEM = "jardinagem"
     OUTROS = "outros"
 
+# ==================== IDENTIFICADORES ====================
+
+class IdGenerator:
+    """IDs no formato UUIDv7: ordenados pelo instante de criação e monotônicos no processo.
+
+    Os 48 bits mais altos são o timestamp em milissegundos e os 12 seguintes um
+    contador dentro do mesmo milissegundo, então a ordem das strings acompanha a
+    ordem de criação (bom para índices ordenados, paginação por chave e inserts).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._last_ms = 0
+        self._counter = 0
+
+    def __call__(self, moment: Optional[datetime] = None) -> str:
+        ms = int((moment.timestamp() if moment else time.time()) * 1000)
+        with self._lock:
+            if ms <= self._last_ms:
+                # Mesmo milissegundo (ou relógio atrasado): avança o contador
+                ms = self._last_ms
+                self._counter += 1
+                if self._counter > 0xFFF:
+                    ms += 1
+                    self._counter = 0
+            else:
+                self._counter = 0
+            self._last_ms = ms
+            counter = self._counter
+        rand = int.from_bytes(os.urandom(8), "big") & ((1 << 62) - 1)
+        return str(uuid.UUID(int=(ms << 80) | (0x7 << 76) | (counter << 64) | (0b10 << 62) | rand))
+
+new_id = IdGenerator()
+
 # ==================== MODELOS ====================
 
 class User(BaseModel):
@@ -82,6 +189,7 @@ class User(BaseModel):
     phone: Optional[str] = None
     created_at: datetime
     password: str  # Em produção, usar hash
+    condo_id: Optional[str] = None
 
 class UserCreate(BaseModel):
     name: str
@@ -103,6 +211,7 @@ class UserResponse(BaseModel):
     apartment: Optional[str] = None
     phone: Optional[str] = None
     created_at: datetime
+    condo_id: Optional[str] = None
 
 class Order(BaseModel):
     id: str
@@ -120,7 +229,18 @@ class Order(BaseModel):
     created_at: datetime
     updated_at: datetime
     completed_at: Optional[datetime] = None
+    cancelled_at: Optional[datetime] = None
     estimated_completion: Optional[datetime] = None
+    sla_breached_at: Optional[datetime] = None
+    condo_id: Optional[str] = None
+    duplicate_of: Optional[str] = None  # ordem principal, quando vinculada como duplicata
+
+class OrderSummary(Order):
+    """Ordem com a atividade desnormalizada, para a listagem"""
+    comment_count: Optional[int] = None
+    internal_comment_count: Optional[int] = None
+    last_activity_at: Optional[datetime] = None
+    last_activity_by: Optional[str] = None
 
 class OrderCreate(BaseModel):
     title: str
@@ -135,6 +255,7 @@ class OrderUpdate(BaseModel):
     assigned_to: Optional[str] = None
     priority: Optional[Priority] = None
     description: Optional[str] = None
+    estimated_completion: Optional[datetime] = None
 
 class Comment(BaseModel):
     id: str
@@ -159,6 +280,44 @@ class Notification(BaseModel):
     read: bool = False
     created_at: datetime
 
+class OrderDetail(BaseModel):
+    order: Order
+    comments: List[Comment]
+    photos: List[str]
+    notifications: List[Notification]
+
+class DuplicateCandidate(BaseModel):
+    order_id: str
+    title: str
+    status: OrderStatus
+    created_at: datetime
+    similarity: float
+
+class OrderCreated(Order):
+    """Ordem recém-criada, com as ordens abertas que parecem relatar o mesmo problema"""
+    duplicate_candidates: List[DuplicateCandidate] = []
+
+class MergeRequest(BaseModel):
+    duplicate_ids: List[str]
+
+class OrderEvent(BaseModel):
+    """Uma alteração de ordem: quem, quando e o valor anterior/novo de cada campo"""
+    seq: int
+    order_id: str
+    type: str  # "created" ou "updated"
+    at: datetime
+    actor_id: Optional[str] = None
+    actor_name: Optional[str] = None
+    changes: dict
+
+class StatusDuration(BaseModel):
+    status: OrderStatus
+    count: int
+    avg_hours: Optional[float] = None
+    p50_hours: Optional[float] = None
+    p90_hours: Optional[float] = None
+    p99_hours: Optional[float] = None
+
 class Stats(BaseModel):
     total_orders: int
     pending_orders: int
@@ -169,54 +328,1775 @@ class Stats(BaseModel):
     orders_by_category: dict
     orders_by_priority: dict
 
+class TimeseriesGranularity(str, Enum):
+    DIA = "day"
+    SEMANA = "week"
+
+class TimeseriesBucket(BaseModel):
+    period_start: date
+    created: int
+    completed: int
+    cancelled: int
+    total_resolution_time_hours: float
+    avg_resolution_time_hours: float
+
+class Timeseries(BaseModel):
+    granularity: TimeseriesGranularity
+    category: Optional[Category] = None
+    priority: Optional[Priority] = None
+    buckets: List[TimeseriesBucket]
+
+# ==================== AGREGADOS (ROLLUPS) ====================
+
+# Limite de buckets por consulta de série temporal (~10 anos por dia)
+MAX_TIMESERIES_BUCKETS = 3660
+
+def _bucket_start(moment: datetime, granularity: TimeseriesGranularity) -> date:
+    """Início do bucket (dia ou segunda-feira da semana) que contém o instante"""
+    day = moment.date()
+    if granularity == TimeseriesGranularity.SEMANA:
+        return day - timedelta(days=day.weekday())
+    return day
+
+def _empty_counters() -> dict:
+    return {"created": 0, "completed": 0, "cancelled": 0, "resolution_seconds": 0.0}
+
+class Rollups:
+    """Contagens por dia e por semana mantidas incrementalmente a cada escrita.
+
+    Cada bucket guarda o total e as quebras por categoria e prioridade, de modo
+    que uma série temporal custa O(buckets) e não O(ordens).
+    """
+
+    def __init__(self):
+        self.buckets: Dict[str, Dict[str, dict]] = {g.value: {} for g in TimeseriesGranularity}
+
+    def _events(self, order: Order):
+        """Eventos (tipo, instante, segundos de resolução) com que a ordem contribui"""
+        yield "created", order.created_at, 0.0
+        if order.status == OrderStatus.CONCLUIDA and order.completed_at:
+            yield "completed", order.completed_at, (order.completed_at - order.created_at).total_seconds()
+        elif order.status == OrderStatus.CANCELADA:
+            yield "cancelled", order.cancelled_at or order.updated_at, 0.0
+
+    def _apply(self, order: Order, sign: int):
+        for event, moment, seconds in self._events(order):
+            for granularity in TimeseriesGranularity:
+                key = _bucket_start(moment, granularity).isoformat()
+                bucket = self.buckets[granularity.value].get(key)
+                if bucket is None:
+                    bucket = {"total": _empty_counters(), "category": {}, "priority": {}}
+                    self.buckets[granularity.value][key] = bucket
+                for counters in (
+                    bucket["total"],
+                    bucket["category"].setdefault(order.category.value, _empty_counters()),
+                    bucket["priority"].setdefault(order.priority.value, _empty_counters()),
+                ):
+                    counters[event] += sign
+                    counters["resolution_seconds"] += sign * seconds
+
+    def add(self, order: Order):
+        self._apply(order, 1)
+
+    def remove(self, order: Order):
+        self._apply(order, -1)
+
+    def rebuild(self, orders: List[Order]):
+        self.buckets = {g.value: {} for g in TimeseriesGranularity}
+        for order in orders:
+            self.add(order)
+
+    def series(
+        self,
+        granularity: TimeseriesGranularity,
+        start: datetime,
+        end: datetime,
+        category: Optional[Category] = None,
+        priority: Optional[Priority] = None
+    ) -> List[TimeseriesBucket]:
+        """Série temporal entre start e end, preenchendo buckets vazios com zero"""
+        step = timedelta(days=7 if granularity == TimeseriesGranularity.SEMANA else 1)
+        current = _bucket_start(start, granularity)
+        last = _bucket_start(end, granularity)
+        buckets = self.buckets[granularity.value]
+        result = []
+        while current <= last:
+            bucket = buckets.get(current.isoformat())
+            counters = _empty_counters()
+            if bucket:
+                if category:
+                    counters = bucket["category"].get(category.value, counters)
+                elif priority:
+                    counters = bucket["priority"].get(priority.value, counters)
+                else:
+                    counters = bucket["total"]
+            total_hours = counters["resolution_seconds"] / 3600
+            result.append(TimeseriesBucket(
+                period_start=current,
+                created=counters["created"],
+                completed=counters["completed"],
+                cancelled=counters["cancelled"],
+                total_resolution_time_hours=round(total_hours, 2),
+                avg_resolution_time_hours=round(total_hours / counters["completed"], 2) if counters["completed"] else 0
+            ))
+            current += step
+        return result
+
+# ==================== ÍNDICES ====================
+
+def _local_naive(moment: Optional[datetime]) -> Optional[datetime]:
+    """Converte um instante com fuso (ex.: "...Z" na query) para a hora local sem fuso das ordens"""
+    if moment is None or moment.tzinfo is None:
+        return moment
+    return moment.astimezone().replace(tzinfo=None)
+
+class TimeIndex:
+    """Entidades ordenadas por um instante, com busca binária para janelas de tempo.
+
+    Consultas por intervalo custam O(log n + k) em vez de varrer a coleção.
+    """
+
+    def __init__(self):
+        self._keys: List[datetime] = []
+        self._items: list = []
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, moment: datetime, item):
+        i = bisect_right(self._keys, moment)
+        self._keys.insert(i, moment)
+        self._items.insert(i, item)
+
+    def remove(self, moment: datetime, item):
+        i = bisect_left(self._keys, moment)
+        while i < len(self._keys) and self._keys[i] == moment:
+            if self._items[i].id == item.id:
+                del self._keys[i]
+                del self._items[i]
+                return
+            i += 1
+
+    def range(self, start: Optional[datetime] = None, end: Optional[datetime] = None) -> list:
+        """Itens com start <= instante <= end, em ordem crescente"""
+        lo = bisect_left(self._keys, start) if start is not None else 0
+        hi = bisect_right(self._keys, end) if end is not None else len(self._keys)
+        return self._items[lo:hi]
+
+    def rebuild(self, pairs):
+        pairs = sorted(pairs, key=lambda p: p[0])
+        self._keys = [p[0] for p in pairs]
+        self._items = [p[1] for p in pairs]
+
+class EncodedCache:
+    """JSON já codificado de cada entidade, em LRU, descartado quando ela muda.
+
+    Listagens concatenam os fragmentos em vez de validar e codificar de novo
+    cada item a cada requisição.
+    """
+
+    def __init__(self, max_entries: int, encode):
+        self.max_entries = max_entries
+        self._encode = encode
+        self._entries: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, item) -> bytes:
+        fragment = self._entries.get(item.id)
+        if fragment is not None:
+            self._entries.move_to_end(item.id)
+            self.hits += 1
+            return fragment
+        self.misses += 1
+        fragment = self._encode(item)
+        if self.max_entries > 0:
+            self._entries[item.id] = fragment
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return fragment
+
+    def invalidate(self, item_id: str):
+        self._entries.pop(item_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+def _encode_order_summary(order: Order) -> bytes:
+    # Mesmo formato da listagem (response_model=List[OrderSummary])
+    return OrderSummary.model_construct(**dict(order)).model_dump_json().encode()
+
+PRIORITY_RANK = {Priority.URGENTE: 0, Priority.ALTA: 1, Priority.MEDIA: 2, Priority.BAIXA: 3}
+
+def _queue_entry(order) -> Optional[tuple]:
+    """(responsável, chave de ordenação) das ordens pendentes atribuídas a alguém"""
+    if not order.assigned_to or order.status != OrderStatus.PENDENTE:
+        return None
+    return order.assigned_to, (PRIORITY_RANK[order.priority], order.created_at.timestamp(), order.id)
+
+class WorkQueues:
+    """Fila de ordens pendentes de cada responsável, ordenada por (prioridade, criação).
+
+    Cada fila é uma lista ordenada por busca binária, como o TimeIndex: inserir e
+    remover localizam a posição em O(log n) e as k primeiras são um fatiamento.
+    """
+
+    def __init__(self):
+        self._queues: Dict[str, list] = {}
+        self._entries: Dict[str, tuple] = {}  # order_id -> (responsável, chave)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def update(self, order):
+        """Recoloca a ordem na fila certa (ou a retira) conforme responsável, status e prioridade"""
+        entry = _queue_entry(order)
+        if self._entries.get(order.id) == entry:
+            return
+        self.discard(order.id)
+        if entry is not None:
+            assignee, key = entry
+            queue = self._queues.setdefault(assignee, [])
+            queue.insert(bisect_left(queue, key), key)
+            self._entries[order.id] = entry
+
+    def discard(self, order_id: str):
+        entry = self._entries.pop(order_id, None)
+        if entry is not None:
+            assignee, key = entry
+            queue = self._queues[assignee]
+            del queue[bisect_left(queue, key)]
+            if not queue:
+                del self._queues[assignee]
+
+    def top(self, assignee: str, limit: int) -> List[str]:
+        """IDs das `limit` primeiras ordens da fila do responsável"""
+        return [key[2] for key in self._queues.get(assignee, [])[:limit]]
+
+    def rebuild(self, orders):
+        self._queues = {}
+        self._entries = {}
+        for order in orders:
+            if (entry := _queue_entry(order)) is not None:
+                self._queues.setdefault(entry[0], []).append(entry[1])
+                self._entries[order.id] = entry
+        for queue in self._queues.values():
+            queue.sort()
+
+# ==================== SNAPSHOTS DE LEITURA ====================
+
+class Snapshot:
+    """Visão estável de um conjunto de ordens, fixada para um relatório (MVCC simplificado).
+
+    Fixar custa uma cópia de referências. Os handlers continuam alterando as
+    ordens in-place: enquanto o snapshot está fixado, order_update guarda nele a
+    versão anterior de cada ordem antes da primeira alteração (cópia na escrita).
+    Assim o relatório pode rodar numa thread sem travar as escritas.
+    """
+
+    def __init__(self, orders):
+        self._orders = tuple(orders)
+        self._before: Dict[str, Order] = {}
+
+    def __len__(self):
+        return len(self._orders)
+
+    def preserve(self, before: Order):
+        self._before.setdefault(before.id, before)
+
+    def read(self, fn):
+        """Aplica `fn` a cada ordem como ela estava ao fixar o snapshot"""
+        before = self._before
+        for order in self._orders:
+            value = fn(order)
+            # A versão anterior é guardada antes de qualquer escrita: se ela não
+            # existe depois da leitura, nada mudou durante a leitura
+            previous = before.get(order.id)
+            yield value if previous is None else fn(previous)
+
+    def rows(self, *fields: str):
+        """Os campos pedidos de cada ordem (uma tupla quando são vários, como em attrgetter)"""
+        return self.read(attrgetter(*fields))
+
+# ==================== PRAZOS DE SLA ====================
+
+# Prioridade seguinte quando o prazo estimado estoura
+PRIORITY_ESCALATION = {
+    Priority.BAIXA: Priority.MEDIA,
+    Priority.MEDIA: Priority.ALTA,
+    Priority.ALTA: Priority.URGENTE,
+    Priority.URGENTE: Priority.URGENTE,
+}
+
+def _sla_deadline(order: Order) -> Optional[datetime]:
+    """Prazo a vigiar: só ordens abertas, com previsão e ainda não escaladas"""
+    if order.status not in (OrderStatus.PENDENTE, OrderStatus.EM_ANDAMENTO) or order.sla_breached_at:
+        return None
+    return order.estimated_completion
+
+class LoopWakeup:
+    """Acorda uma tarefa do event loop; pode ser chamado de qualquer thread.
+
+    O asyncio.Event só nasce em `bind`, dentro do lifespan, porque fica preso ao
+    loop em que é usado pela primeira vez (e cada servidor ou TestClient tem o
+    seu). Fora do loop o set é agendado com call_soon_threadsafe.
+    """
+
+    def __init__(self):
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.event: Optional[asyncio.Event] = None
+
+    def bind(self):
+        self.loop = asyncio.get_running_loop()
+        self.event = asyncio.Event()
+
+    def set(self):
+        if self.loop is None or self.loop.is_closed():
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(self.event.set)
+
+# Acorda o timer de SLA (compartilhado por todas as partições)
+sla_wakeup = LoopWakeup()
+
+class DeadlineScheduler:
+    """Min-heap de prazos por ordem, com invalidação preguiçosa.
+
+    Reagendar ou cancelar só troca a versão vigente da ordem (O(log n) / O(1));
+    entradas antigas ficam no heap e são descartadas quando chegam ao topo.
+    `wakeup` avisa o timer quando surge um prazo anterior ao que ele aguarda;
+    as partições de todos os condomínios compartilham o mesmo. `rebuild` roda
+    na carga (numa thread) e não o aciona: quem carrega avisa o timer depois.
+    """
+
+    def __init__(self, wakeup: LoopWakeup):
+        self._heap: List[tuple] = []  # (timestamp, versão, order_id)
+        self._versions: Dict[str, int] = {}
+        self._counter = count()
+        self.wakeup = wakeup
+
+    def __len__(self):
+        return len(self._versions)
+
+    def schedule(self, order_id: str, deadline: datetime):
+        # timestamp() aceita datas com e sem fuso, que não se comparam entre si
+        moment = deadline.timestamp()
+        version = next(self._counter)
+        self._versions[order_id] = version
+        earlier = not self._heap or moment < self._heap[0][0]
+        heappush(self._heap, (moment, version, order_id))
+        if len(self._heap) > 64 and len(self._heap) > 2 * len(self._versions):
+            self._compact()
+        if earlier:
+            self.wakeup.set()
+
+    def cancel(self, order_id: str):
+        self._versions.pop(order_id, None)
+
+    def next_deadline(self) -> Optional[float]:
+        """Timestamp do próximo prazo vigente, ou None se não houver nenhum"""
+        while self._heap and self._versions.get(self._heap[0][2]) != self._heap[0][1]:
+            heappop(self._heap)
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[str]:
+        """Remove e devolve as ordens com prazo vencido até `now`"""
+        due = []
+        while (deadline := self.next_deadline()) is not None and deadline <= now:
+            _, _, order_id = heappop(self._heap)
+            del self._versions[order_id]
+            due.append(order_id)
+        return due
+
+    def rebuild(self, pairs):
+        self._versions = {}
+        self._heap = []
+        for order_id, deadline in pairs:
+            version = next(self._counter)
+            self._versions[order_id] = version
+            self._heap.append((deadline.timestamp(), version, order_id))
+        heapify(self._heap)
+
+    def _compact(self):
+        self._heap = [e for e in self._heap if self._versions.get(e[2]) == e[1]]
+        heapify(self._heap)
+
+# ==================== DETECÇÃO DE DUPLICADAS ====================
+
+# Assinaturas MinHash de 32 posições; as 30 primeiras formam 10 faixas de 3 para o
+# LSH: pares com similaridade (Jaccard) de 0,6 colidem em alguma faixa com ~91% de chance
+DUPLICATE_SIGNATURE_SIZE = 32
+DUPLICATE_BAND_ROWS = 3
+DUPLICATE_SHINGLE = 3
+# Similaridade estimada mínima para sugerir uma duplicata
+DUPLICATE_SIMILARITY = float(os.environ.get("CONDOOS_DUPLICATE_SIMILARITY", "0.5"))
+# Ordens mais recentes examinadas por faixa (limita o custo quando um texto se repete muito)
+DUPLICATE_BUCKET_SCAN = 16
+
+def _normalize_text(text: str) -> str:
+    # Sem acentos ("º" vira "o"): a decomposição separa os diacríticos, que o ascii descarta
+    text = unicodedata.normalize("NFKD", text.lower()).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]+", " ", text).strip()
+
+def _minhash(text: str) -> Optional[array]:
+    """Assinatura MinHash dos shingles de caracteres, com uma só função de hash.
+
+    Cada shingle cai numa posição pelo próprio hash e cada posição guarda o menor
+    valor recebido; posições vazias copiam a próxima preenchida (densificação),
+    deslocada pela distância para não fabricar coincidências. Custa O(shingles)
+    em vez de O(shingles × posições) das permutações independentes. O hash de
+    str do Python varia entre processos, o que basta: as assinaturas só vivem
+    em memória.
+    """
+    text = _normalize_text(text)
+    if not text:
+        return None
+    size = DUPLICATE_SIGNATURE_SIZE
+    empty = 1 << 32
+    slots = [empty] * size
+    for shingle in {text[i:i + DUPLICATE_SHINGLE] for i in range(max(len(text) - DUPLICATE_SHINGLE + 1, 1))}:
+        h = hash(shingle)
+        # Tamanho potência de 2: posição e valor saem de bits distintos do mesmo hash
+        slot, value = h & (size - 1), (h >> 8) & 0xFFFFFFFF
+        if value < slots[slot]:
+            slots[slot] = value
+    if empty in slots:
+        filled = slots[:]
+        for i in range(size):
+            distance = 0
+            while slots[(i + distance) % size] == empty:
+                distance += 1
+            filled[i] = (slots[(i + distance) % size] + distance * 0x9E3779B1) & 0xFFFFFFFF
+        slots = filled
+    return array("I", slots)
+
+def _duplicate_eligible(order: Order) -> bool:
+    return order.status in (OrderStatus.PENDENTE, OrderStatus.EM_ANDAMENTO) and not order.duplicate_of
+
+class DuplicateIndex:
+    """Índice LSH das ordens abertas, para achar relatos quase idênticos do mesmo problema.
+
+    A assinatura MinHash de título + descrição é cortada em faixas; cada faixa,
+    junto com a categoria, é a chave de um balde. Candidatas são as ordens que
+    dividem algum balde com a consultada, confirmadas pela fração de posições
+    iguais das assinaturas (a estimativa do Jaccard). A consulta custa o número
+    de faixas vezes DUPLICATE_BUCKET_SCAN, qualquer que seja o total de ordens.
+    """
+
+    def __init__(self):
+        self.signatures: Dict[str, array] = {}
+        self._keys: Dict[str, List[int]] = {}  # order_id -> chaves dos seus baldes
+        # Baldes como dicts (ordem de inserção): remoção O(1) e as mais recentes no fim
+        self._buckets: Dict[int, Dict[str, None]] = {}
+
+    def __len__(self):
+        return len(self.signatures)
+
+    @staticmethod
+    def _band_keys(category: Category, signature: array) -> List[int]:
+        rows = DUPLICATE_BAND_ROWS
+        return [
+            hash((category.value, band, signature[band * rows:(band + 1) * rows].tobytes()))
+            for band in range(DUPLICATE_SIGNATURE_SIZE // rows)
+        ]
+
+    def add(self, order: Order):
+        signature = _minhash(f"{order.title} {order.description}")
+        if signature is None:
+            return
+        keys = self._band_keys(order.category, signature)
+        self.signatures[order.id] = signature
+        self._keys[order.id] = keys
+        for key in keys:
+            self._buckets.setdefault(key, {})[order.id] = None
+
+    def discard(self, order_id: str):
+        if self.signatures.pop(order_id, None) is None:
+            return
+        for key in self._keys.pop(order_id):
+            bucket = self._buckets[key]
+            del bucket[order_id]
+            if not bucket:
+                del self._buckets[key]
+
+    def update(self, order: Order, before: Order):
+        """Acompanha fechamento, vínculo a uma ordem principal e mudança de descrição"""
+        if not _duplicate_eligible(order):
+            self.discard(order.id)
+        elif order.id not in self.signatures or order.description != before.description:
+            self.discard(order.id)
+            self.add(order)
+
+    def candidates(self, order: Order, limit: int = 5) -> List[tuple]:
+        """(order_id, similaridade) das ordens abertas parecidas, da mais parecida para a menos"""
+        signature = self.signatures.get(order.id) or _minhash(f"{order.title} {order.description}")
+        if signature is None:
+            return []
+        seen = set()
+        for key in self._band_keys(order.category, signature):
+            seen.update(islice(reversed(self._buckets.get(key, {})), DUPLICATE_BUCKET_SCAN))
+        seen.discard(order.id)
+        scored = []
+        for other_id in seen:
+            similarity = sum(map(eq, signature, self.signatures[other_id])) / DUPLICATE_SIGNATURE_SIZE
+            if similarity >= DUPLICATE_SIMILARITY:
+                scored.append((other_id, similarity))
+        scored.sort(key=lambda x: x[1], reverse=True)
+        return scored[:limit]
+
+    def rebuild(self, orders):
+        self.signatures = {}
+        self._keys = {}
+        self._buckets = {}
+        for order in orders:
+            if _duplicate_eligible(order):
+                self.add(order)
+
+# ==================== ARQUIVO DE ORDENS FECHADAS ====================
+
+def _is_completed(order: Order) -> bool:
+    return order.status == OrderStatus.CONCLUIDA and order.completed_at is not None
+
+def _closed_at(order: Order) -> Optional[datetime]:
+    """Instante em que a ordem foi fechada, ou None se ainda está aberta"""
+    if order.status == OrderStatus.CONCLUIDA:
+        return order.completed_at or order.updated_at
+    if order.status == OrderStatus.CANCELADA:
+        return order.cancelled_at or order.updated_at
+    return None
+
+class Archive:
+    """Segmentos comprimidos, somente-anexação, com ordens fechadas antigas.
+
+    Cada segmento é um arquivo JSON Lines em gzip com uma linha por ordem
+    (a ordem, seus comentários e suas notificações). O manifesto guarda apenas
+    os ids de cada segmento; o conteúdo é lido sob demanda.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.segments: List[dict] = []
+        self.segment_of: Dict[str, str] = {}
+
+    def load(self):
+        manifest = self.directory / "manifest.json"
+        if manifest.exists():
+            with open(manifest, "r") as f:
+                self.segments = json.load(f)["segments"]
+        for segment in self.segments:
+            for order_id in segment["order_ids"]:
+                self.segment_of[order_id] = segment["name"]
+
+    def __contains__(self, order_id: str) -> bool:
+        return order_id in self.segment_of
+
+    def __len__(self):
+        return len(self.segment_of)
+
+    def append_segment(self, records: List[dict]) -> str:
+        """Grava um novo segmento e o registra no manifesto"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        name = self._write_segment(records)
+        self.segments.append(self._describe_segment(name, records))
+        for record in records:
+            self.segment_of[record["order"]["id"]] = name
+        self._write_manifest()
+        return name
+
+    def _write_segment(self, records) -> str:
+        last = max((int(s["name"].split("-")[1].split(".")[0]) for s in self.segments), default=0)
+        name = f"segment-{last + 1:06d}.jsonl.gz"
+        tmp_path = self.directory / (name + ".tmp")
+        with gzip.open(tmp_path, "wt", encoding="utf-8") as f:
+            for record in records:
+                f.write(json.dumps(record, default=str) + "\n")
+        os.replace(tmp_path, self.directory / name)
+        return name
+
+    @staticmethod
+    def _describe_segment(name: str, records: List[dict]) -> dict:
+        created = [r["order"]["created_at"] for r in records]
+        return {
+            "name": name,
+            "order_ids": [r["order"]["id"] for r in records],
+            "created_from": min(created),
+            "created_to": max(created),
+        }
+
+    def _write_manifest(self):
+        with open(self.directory / "manifest.json.tmp", "w") as f:
+            json.dump({"segments": self.segments}, f)
+        os.replace(self.directory / "manifest.json.tmp", self.directory / "manifest.json")
+
+    def merge_segments(self) -> dict:
+        """Junta todos os segmentos em um só (manutenção offline)"""
+        if len(self.segments) < 2:
+            return {"merged": 0, "segment": self.segments[0]["name"] if self.segments else None}
+        old = [s["name"] for s in self.segments]
+        records = [r for name in old for r in self.read_segment(name)]
+        name = self._write_segment(records)
+        self.segments = [self._describe_segment(name, records)]
+        self.segment_of = {r["order"]["id"]: name for r in records}
+        self._write_manifest()
+        for old_name in old:
+            (self.directory / old_name).unlink(missing_ok=True)
+        return {"merged": len(old), "segment": name}
+
+    def rebuild_manifest(self) -> int:
+        """Reconstrói o manifesto lendo os arquivos de segmento presentes em disco"""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.segments = []
+        self.segment_of = {}
+        for path in sorted(self.directory.glob("segment-*.jsonl.gz")):
+            records = self.read_segment(path.name)
+            if records:
+                self.segments.append(self._describe_segment(path.name, records))
+                for record in records:
+                    self.segment_of[record["order"]["id"]] = path.name
+        self._write_manifest()
+        return len(self.segments)
+
+    def read_segment(self, name: str) -> List[dict]:
+        return _read_archive_segment(self.directory / name)
+
+    def get(self, order_id: str) -> Optional[dict]:
+        """Registro arquivado (ordem, comentários, notificações) de uma ordem"""
+        name = self.segment_of.get(order_id)
+        if not name:
+            return None
+        return next((r for r in self.read_segment(name) if r["order"]["id"] == order_id), None)
+
+    def iter_orders(self, start: Optional[datetime] = None, end: Optional[datetime] = None):
+        """Percorre as ordens arquivadas, abrindo só os segmentos que cruzam a janela"""
+        for segment in self.segments:
+            if start and datetime.fromisoformat(segment["created_to"]) < start:
+                continue
+            if end and datetime.fromisoformat(segment["created_from"]) > end:
+                continue
+            for record in self.read_segment(segment["name"]):
+                order = Order(**record["order"])
+                if (start is None or order.created_at >= start) and (end is None or order.created_at <= end):
+                    yield order
+
+@lru_cache(maxsize=8)
+def _read_archive_segment(path: Path) -> List[dict]:
+    # Segmentos nunca são reescritos, então o cache não precisa de invalidação
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+# ==================== MÉTRICAS ====================
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (128, 512, 2048, 8192, 32768, 131072, 524288, 2097152, 8388608)
+
+class Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+def _format_labels(labels: tuple) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}"
+
+class MetricsRegistry:
+    """Contadores, gauges e histogramas em memória, expostos no formato texto do Prometheus.
+
+    Registrar um valor custa um lookup de dicionário (mais uma busca binária
+    nos histogramas); toda a formatação fica para o momento da coleta.
+    """
+
+    def __init__(self):
+        self._meta: Dict[str, tuple] = {}
+        self._values: Dict[str, dict] = {}
+        self._collectors = []
+
+    def describe(self, name: str, kind: str, help: str, buckets=None):
+        self._meta[name] = (kind, help, buckets)
+        self._values.setdefault(name, {})
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        values = self._values[name]
+        key = tuple(labels.items())
+        values[key] = values.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels):
+        self._values[name][tuple(labels.items())] = value
+
+    def observe(self, name: str, value: float, **labels):
+        values = self._values[name]
+        key = tuple(labels.items())
+        histogram = values.get(key)
+        if histogram is None:
+            histogram = values[key] = Histogram(self._meta[name][2])
+        histogram.observe(value)
+
+    def collector(self, func):
+        """Registra uma função chamada a cada coleta (para gauges calculados sob demanda)"""
+        self._collectors.append(func)
+        return func
+
+    def render(self) -> str:
+        for collect in self._collectors:
+            collect()
+        lines = []
+        for name, (kind, help, buckets) in self._meta.items():
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in self._values[name].items():
+                if kind != "histogram":
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+                    continue
+                cumulative = 0
+                for bound, count in zip(list(value.buckets) + ["+Inf"], value.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {value.sum}")
+                lines.append(f"{name}_count{_format_labels(labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+metrics = MetricsRegistry()
+metrics.describe("condoos_http_requests_total", "counter", "Requisições HTTP por rota, método e status")
+metrics.describe("condoos_http_request_duration_seconds", "histogram", "Latência das requisições HTTP", LATENCY_BUCKETS)
+metrics.describe("condoos_http_response_size_bytes", "histogram", "Tamanho do corpo das respostas HTTP", SIZE_BUCKETS)
+metrics.describe("condoos_http_requests_in_flight", "gauge", "Requisições HTTP em andamento")
+metrics.describe("condoos_collection_items", "gauge", "Itens em memória por coleção")
+metrics.describe("condoos_save_data_duration_seconds", "histogram", "Tempo gasto em Database._save_data", LATENCY_BUCKETS)
+metrics.describe("condoos_save_data_bytes_total", "counter", "Bytes gravados em disco por _save_data")
+metrics.describe("condoos_save_data_last_bytes", "gauge", "Bytes gravados na última execução de _save_data")
+metrics.describe("condoos_event_loop_lag_seconds", "gauge", "Atraso medido do event loop na última amostra")
+metrics.describe("condoos_event_loop_lag_max_seconds", "gauge", "Maior atraso do event loop desde o início")
+metrics.set("condoos_http_requests_in_flight", 0)
+
+class MetricsMiddleware:
+    """Middleware ASGI que mede latência, tamanho de resposta e concorrência por rota"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        
+        start = time.perf_counter()
+        response = {"status": 500, "size": 0}
+        
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["size"] += len(message.get("body", b""))
+            await send(message)
+        
+        metrics.inc("condoos_http_requests_in_flight")
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            metrics.inc("condoos_http_requests_in_flight", -1)
+            # Rotulado pelo template da rota para não explodir a cardinalidade
+            route = scope.get("route")
+            path = route.path if route is not None else "<other>"
+            method = scope["method"]
+            metrics.observe("condoos_http_request_duration_seconds", time.perf_counter() - start, method=method, route=path)
+            metrics.observe("condoos_http_response_size_bytes", response["size"], method=method, route=path)
+            metrics.inc("condoos_http_requests_total", method=method, route=path, status=response["status"])
+
+async def _event_loop_lag_loop(interval: float = 0.5):
+    """Mede quanto o event loop atrasa para acordar uma tarefa agendada"""
+    loop = asyncio.get_running_loop()
+    worst = 0.0
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - start - interval, 0.0)
+        worst = max(worst, lag)
+        metrics.set("condoos_event_loop_lag_seconds", lag)
+        metrics.set("condoos_event_loop_lag_max_seconds", worst)
+
+# ==================== PROFILING SOB DEMANDA ====================
+
+def _collapse_stack(frame) -> str:
+    """Pilha no formato "collapsed" (raiz primeiro, separada por ';') usado por flamegraphs"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+class StackSampler(threading.Thread):
+    """Amostra periodicamente a pilha de uma thread e conta as pilhas colapsadas"""
+
+    def __init__(self, thread_id: int, interval: float = 0.002):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks: Dict[str, int] = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is not None:
+                stack = _collapse_stack(frame)
+                self.stacks[stack] = self.stacks.get(stack, 0) + 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+def _profile_requested(scope) -> bool:
+    if b"profile=1" in scope.get("query_string", b"").split(b"&"):
+        return True
+    return any(k == b"x-condoos-profile" and v == b"1" for k, v in scope["headers"])
+
+def _is_admin_request(scope) -> bool:
+    for key, value in scope["headers"]:
+        if key == b"authorization":
+            token = _bearer_token(value.decode("latin-1"))
+            user = db.users_by_id.get(_token_user_id(token)) if token else None
+            return user is not None and user.role == UserRole.ADMIN
+    return False
+
+class ProfilingMiddleware:
+    """Executa uma requisição sob cProfile e amostragem de pilha quando um admin pede.
+
+    Ativado pelo header "X-CondoOS-Profile: 1" ou pelo parâmetro "profile=1"
+    com token de admin. O perfil cobre a resolução de dependências, o handler e a
+    serialização da resposta; como o cProfile mede a thread inteira, corrotinas de
+    outras requisições concorrentes também podem aparecer. Só um perfil roda por vez.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._busy = False
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] != "http"
+            or self._busy
+            or not _profile_requested(scope)
+            or not _is_admin_request(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+        
+        import cProfile
+        self._busy = True
+        profiler = cProfile.Profile()
+        sampler = StackSampler(threading.get_ident())
+        started_at = datetime.now()
+        start = time.perf_counter()
+        sampler.start()
+        profiler.enable()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            profiler.disable()
+            sampler.stop()
+            self._busy = False
+            _store_profile(scope, started_at, time.perf_counter() - start, profiler, sampler.stacks)
+
+app.add_middleware(ProfilingMiddleware)
+
+def _store_profile(scope, started_at: datetime, duration: float, profiler, stacks: Dict[str, int]):
+    """Grava o perfil (pstats + pilhas colapsadas) no anel em disco"""
+    try:
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        profile_id = f"{started_at.strftime('%Y%m%d%H%M%S%f')}-{uuid.uuid4().hex[:8]}"
+        profiler.dump_stats(PROFILE_DIR / f"{profile_id}.pstats")
+        with open(PROFILE_DIR / f"{profile_id}.collapsed", "w") as f:
+            for stack, count in stacks.items():
+                f.write(f"{stack} {count}\n")
+        with open(PROFILE_DIR / f"{profile_id}.json", "w") as f:
+            json.dump({
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "created_at": started_at.isoformat(),
+                "duration_ms": round(duration * 1000, 3),
+                "samples": sum(stacks.values()),
+            }, f)
+        
+        # Anel limitado: descarta os perfis mais antigos
+        for old in sorted(PROFILE_DIR.glob("*.json"))[:-PROFILE_RING_SIZE]:
+            for suffix in (".json", ".pstats", ".collapsed"):
+                old.with_suffix(suffix).unlink(missing_ok=True)
+    except Exception as e:
+        print(f"Erro ao salvar perfil: {e}")
+
+# ==================== DETECTOR DE BLOQUEIO DO EVENT LOOP ====================
+
+metrics.describe("condoos_event_loop_stalls_total", "counter", "Bloqueios do event loop acima do limite, por ponto de chamada")
+metrics.describe("condoos_event_loop_stall_max_seconds", "gauge", "Maior bloqueio do event loop por ponto de chamada")
+
+def _stall_site(frame) -> str:
+    """Ponto de chamada responsável: o frame mais interno dentro deste módulo"""
+    innermost = frame
+    while frame is not None:
+        if frame.f_code.co_filename == __file__:
+            return f"{os.path.basename(__file__)}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    code = innermost.f_code
+    return f"{os.path.basename(code.co_filename)}:{innermost.f_lineno} {code.co_name}"
+
+class LoopWatchdog:
+    """Detecta bloqueios do event loop com uma tarefa de heartbeat e uma thread monitora.
+
+    Quando o heartbeat atrasa além do limite, a thread monitora captura a pilha
+    da thread do loop naquele instante e agrega as ocorrências por ponto de chamada.
+    """
+
+    def __init__(self, threshold: float, interval: float = 0.05):
+        self.threshold = threshold
+        self.interval = interval
+        self.sites: Dict[str, dict] = {}
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._stop_event = threading.Event()
+
+    async def run(self):
+        if self.threshold <= 0:
+            return
+        self._loop_thread_id = threading.get_ident()
+        self._stop_event.clear()
+        monitor = threading.Thread(target=self._monitor, name="loop-watchdog", daemon=True)
+        monitor.start()
+        try:
+            while True:
+                self._last_beat = time.monotonic()
+                await asyncio.sleep(self.interval)
+        finally:
+            self._stop_event.set()
+
+    def _monitor(self):
+        stall = None
+        while not self._stop_event.wait(self.interval):
+            stalled_for = time.monotonic() - self._last_beat - self.interval
+            if stalled_for > self.threshold:
+                if stall is None:
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    if frame is None:
+                        continue
+                    stall = {"site": _stall_site(frame), "stack": "".join(traceback.format_stack(frame))}
+                stall["duration"] = stalled_for
+            elif stall is not None:
+                self._record(stall)
+                stall = None
+
+    def _record(self, stall: dict):
+        site = self.sites.setdefault(stall["site"], {"count": 0, "max_seconds": 0.0, "total_seconds": 0.0})
+        site["count"] += 1
+        site["total_seconds"] += stall["duration"]
+        site["max_seconds"] = max(site["max_seconds"], stall["duration"])
+        site["last_stack"] = stall["stack"]
+        metrics.inc("condoos_event_loop_stalls_total", site=stall["site"])
+        metrics.set("condoos_event_loop_stall_max_seconds", site["max_seconds"], site=stall["site"])
+        print(f"Event loop bloqueado por {stall['duration'] * 1000:.0f} ms em {stall['site']}:\n{stall['stack']}")
+
+loop_watchdog = LoopWatchdog(LOOP_STALL_THRESHOLD_MS / 1000)
+
+# ==================== LIMITE DE REQUISIÇÕES ====================
+
+class RateLimitPolicy:
+    def __init__(self, name: str, capacity: float, per_second: float, key: str):
+        self.name = name
+        self.capacity = capacity
+        self.per_second = per_second
+        self.key = key  # "user" (token, ou IP sem token) ou "ip"
+
+# (método, prefixo do caminho, política); a primeira que casar vale
+RATE_LIMIT_POLICIES = [
+    ("POST", "/api/auth/login", RateLimitPolicy("login", capacity=5, per_second=5 / 60, key="ip")),
+    ("GET", "/api/notifications", RateLimitPolicy("notifications", capacity=20, per_second=0.5, key="user")),
+    (None, "/api/", RateLimitPolicy("default", capacity=60, per_second=20, key="user")),
+]
+
+metrics.describe("condoos_rate_limited_total", "counter", "Requisições recusadas com 429, por política")
+metrics.describe("condoos_rate_limit_buckets", "gauge", "Buckets de limite de requisições em memória")
+
+class RateLimiter:
+    """Token buckets em memória: custo O(1) por requisição.
+
+    Cada bucket é [tokens, último acesso]; o reabastecimento é calculado na hora
+    a partir do tempo decorrido, sem timers por bucket.
+    """
+
+    def __init__(self):
+        self.buckets: Dict[tuple, list] = {}
+
+    def acquire(self, policy: RateLimitPolicy, identity: str) -> float:
+        """Consome um token; devolve 0 se permitido ou os segundos até o próximo token"""
+        now = time.monotonic()
+        key = (policy.name, identity)
+        bucket = self.buckets.get(key)
+        if bucket is None:
+            bucket = self.buckets[key] = [policy.capacity, now]
+        else:
+            bucket[0] = min(policy.capacity, bucket[0] + (now - bucket[1]) * policy.per_second)
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return 0.0
+        return (1 - bucket[0]) / policy.per_second
+
+    def evict_idle(self) -> int:
+        """Remove buckets que já estariam cheios (equivalentes a um bucket novo)"""
+        now = time.monotonic()
+        policies = {policy.name: policy for _, _, policy in RATE_LIMIT_POLICIES}
+        idle = [
+            key for key, (tokens, last) in self.buckets.items()
+            if tokens + (now - last) * policies[key[0]].per_second >= policies[key[0]].capacity
+        ]
+        for key in idle:
+            del self.buckets[key]
+        return len(idle)
+
+rate_limiter = RateLimiter()
+
+@metrics.collector
+def _collect_rate_limit_buckets():
+    metrics.set("condoos_rate_limit_buckets", len(rate_limiter.buckets))
+
+def _request_identity(scope, policy: RateLimitPolicy) -> str:
+    """Usuário do token (com o condomínio) ou, se o token não resolver para ninguém, o IP.
+
+    Como o limite roda antes do TenantMiddleware, só partições já carregadas
+    resolvem usuários: a primeira requisição a uma partição fria conta pelo IP.
+    Assim variações do header (caixa do esquema, tokens inventados) não criam
+    buckets novos.
+    """
+    if policy.key == "user":
+        for key, value in scope["headers"]:
+            if key == b"authorization":
+                token = _bearer_token(value.decode("latin-1"))
+                if token is not None:
+                    condo_id, user_id = _token_condo(token), _token_user_id(token)
+                    partition = tenants.peek(condo_id)
+                    if partition is not None and user_id in partition.users_by_id:
+                        return f"user:{condo_id or ''}:{user_id}"
+                break
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+class RateLimitMiddleware:
+    """Aplica a primeira política de RATE_LIMIT_POLICIES que casar com a requisição"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and RATE_LIMIT_ENABLED:
+            for method, prefix, policy in RATE_LIMIT_POLICIES:
+                if (method is None or scope["method"] == method) and scope["path"].startswith(prefix):
+                    retry_after = rate_limiter.acquire(policy, _request_identity(scope, policy))
+                    if retry_after:
+                        metrics.inc("condoos_rate_limited_total", policy=policy.name)
+                        response = JSONResponse(
+                            {"detail": "Muitas requisições"},
+                            status_code=429,
+                            headers={"Retry-After": str(math.ceil(retry_after))}
+                        )
+                        await response(scope, receive, send)
+                        return
+                    break
+        await self.app(scope, receive, send)
+
+async def _rate_limit_eviction_loop(interval: float = 60):
+    while True:
+        await asyncio.sleep(interval)
+        rate_limiter.evict_idle()
+
+# ==================== JOURNAL DE ALTERAÇÕES ====================
+
+class Journal:
+    """Registro somente-anexação (JSON Lines) de cada alteração, com número de sequência.
+
+    Cada entrada traz a imagem completa das entidades gravadas ("put"), os ids
+    removidos ("delete") ou as ordens movidas para o arquivo ("archive"). Como
+    reaplicar uma entrada é idempotente, um backup mais a sequência do journal a
+    partir dele reconstroem a base em qualquer ponto.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.seq = 0
+        self.lock = threading.Lock()
+        self._file = None
+
+    def load(self, truncate: bool = True):
+        """Retoma a sequência a partir da última entrada completa.
+
+        Lê o arquivo de trás para frente em blocos até achar a última linha
+        inteira (entradas com imagens completas podem passar de 1 MB). Uma linha
+        final sem quebra, de uma gravação interrompida, é descartada (e cortada
+        do arquivo, a menos que `truncate` seja falso).
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, "rb+" if truncate else "rb") as f:
+            end = pos = f.seek(0, os.SEEK_END)
+            tail = b""
+            while pos > 0:
+                step = min(65536, pos)
+                pos -= step
+                f.seek(pos)
+                tail = f.read(step) + tail
+                last_newline = tail.rfind(b"\n")
+                if last_newline != -1 and tail.rfind(b"\n", 0, last_newline) != -1:
+                    break
+            last_newline = tail.rfind(b"\n")
+            complete = pos + last_newline + 1
+            if complete < end and truncate:
+                f.truncate(complete)
+            if last_newline != -1:
+                start = tail.rfind(b"\n", 0, last_newline) + 1
+                self.seq = json.loads(tail[start:last_newline])["seq"]
+
+    def append(self, op: str, kind: str, **fields) -> int:
+        with self.lock:
+            if self._file is None:
+                self._file = open(self.path, "a", encoding="utf-8", buffering=1)
+            self.seq += 1
+            entry = {"seq": self.seq, "at": datetime.now(), "op": op, "kind": kind, **fields}
+            self._file.write(json.dumps(entry, default=str) + "\n")
+            return self.seq
+
+    def put(self, kind: str, items: list) -> int:
+        return self.append("put", kind, items=[item.model_dump(mode="json") for item in items])
+
+    def discard_through(self, seq: int) -> int:
+        """Reescreve o journal sem as entradas até `seq`; devolve os bytes liberados.
+
+        A última entrada sempre fica, mesmo que já coberta, porque é dela que
+        load retoma a sequência. Um backup anterior a `seq` deixa de poder
+        avançar por este journal.
+        """
+        with self.lock:
+            if not self.path.exists():
+                return 0
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            size = self.path.stat().st_size
+            tmp_path = self.path.with_name(self.path.name + ".tmp")
+            kept = False
+            last = None
+            with open(self.path, "rb") as src, open(tmp_path, "wb") as dst:
+                for line in src:
+                    if not line.endswith(b"\n"):
+                        break
+                    if json.loads(line)["seq"] > seq:
+                        dst.write(line)
+                        kept = True
+                    else:
+                        last = line
+                if not kept and last is not None:
+                    dst.write(last)
+            os.replace(tmp_path, self.path)
+            return size - self.path.stat().st_size
+
+# ==================== HISTÓRICO DE ORDENS ====================
+
+# Campos cujas alterações viram eventos no histórico
+HISTORY_FIELDS = (
+    "status", "priority", "assigned_to", "assigned_name", "description",
+    "estimated_completion", "sla_breached_at", "photos", "duplicate_of",
+)
+# Tempo em cada status, em horas
+STATUS_DURATION_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 12, 24, 48, 72, 120, 168, 336, 720)
+CLOSED_STATUSES = {OrderStatus.CONCLUIDA.value, OrderStatus.CANCELADA.value}
+
+def _order_changes(before: Optional[Order], after: Order) -> dict:
+    """Campos de HISTORY_FIELDS que mudaram (sem `before`, os preenchidos na criação)"""
+    changes = {}
+    for field in HISTORY_FIELDS:
+        old = getattr(before, field) if before is not None else None
+        new = getattr(after, field)
+        if old != new and (before is not None or new):
+            changes[field] = {"from": old, "to": new}
+    return changes
+
+def _histogram_quantile(histogram: Histogram, q: float) -> Optional[float]:
+    """Quantil estimado por interpolação linear dentro do balde (como o histogram_quantile do Prometheus)"""
+    if not histogram.count:
+        return None
+    rank = q * histogram.count
+    cumulative = 0
+    for i, n in enumerate(histogram.counts):
+        if n and cumulative + n >= rank:
+            if i == len(histogram.buckets):
+                # Acima do último limite só se sabe o mínimo
+                return float(histogram.buckets[-1])
+            lower = histogram.buckets[i - 1] if i else 0.0
+            return lower + (histogram.buckets[i] - lower) * (rank - cumulative) / n
+        cumulative += n
+
+def _round_or_none(value: Optional[float]) -> Optional[float]:
+    return None if value is None else round(value, 2)
+
+class OrderHistory:
+    """Eventos das ordens num arquivo somente-anexação (JSON Lines), indexados por ordem.
+
+    Em memória ficam só as posições dos eventos de cada ordem e os agregados
+    derivados deles: o tempo que cada ordem passou em cada status, acumulado em
+    histogramas à medida que os eventos chegam. A cada EVENT_SNAPSHOT_EVERY
+    eventos, índice e agregados vão para um snapshot; no startup apenas o trecho
+    do arquivo posterior ao snapshot é relido.
+
+    Ordens fechadas saem de `status_since`: o tempo em concluída/cancelada não
+    é medido, nem o de uma ordem reaberta até seu próximo status.
+    """
+
+    def __init__(self, path: Path, snapshot_path: Path):
+        self.path = path
+        self.snapshot_path = snapshot_path
+        self.offsets: Dict[str, List[int]] = {}
+        # order_id -> [status atual, timestamp de entrada nele]
+        self.status_since: Dict[str, list] = {}
+        self.time_in_status = {
+            s.value: Histogram(STATUS_DURATION_BUCKETS) for s in OrderStatus if s.value not in CLOSED_STATUSES
+        }
+        self.size = 0
+        self.count = 0
+        self.snapshot_count = 0
+        self.lock = threading.Lock()
+        self._file = None
+
+    def load(self, truncate: bool = True):
+        if self.snapshot_path.exists() and self.path.exists():
+            with open(self.snapshot_path, "r") as f:
+                state = json.load(f)
+            # Snapshot à frente do arquivo (journal truncado, restauração) é descartado
+            if state["size"] <= self.path.stat().st_size:
+                self.offsets = state["offsets"]
+                self.status_since = state["status_since"]
+                for status_value, h in state["time_in_status"].items():
+                    histogram = self.time_in_status[status_value]
+                    histogram.counts, histogram.sum, histogram.count = h["counts"], h["sum"], h["count"]
+                self.size, self.count = state["size"], state["count"]
+                self.snapshot_count = self.count
+        if not self.path.exists():
+            return
+        offset = self.size
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self._apply(json.loads(line), offset)
+                offset += len(line)
+        # Linha incompleta de uma gravação interrompida
+        if offset < self.path.stat().st_size and truncate:
+            os.truncate(self.path, offset)
+        self.size = offset
+
+    def append(self, event: dict):
+        line = (json.dumps(event, default=str) + "\n").encode()
+        with self.lock:
+            if self._file is None:
+                self._file = open(self.path, "ab", buffering=0)
+            offset = self.size
+            self._file.write(line)
+            self.size += len(line)
+            # Relido do JSON para os agregados tratarem igual eventos novos e do startup
+            self._apply(json.loads(line), offset)
+
+    def _apply(self, event: dict, offset: int):
+        order_id = event["order_id"]
+        self.offsets.setdefault(order_id, []).append(offset)
+        self.count += 1
+        change = event["changes"].get("status")
+        if change is None:
+            return
+        at = datetime.fromisoformat(event["at"]).timestamp()
+        previous = self.status_since.pop(order_id, None)
+        if previous is not None and previous[0] == change["from"]:
+            self.time_in_status[previous[0]].observe(max(at - previous[1], 0) / 3600)
+        if change["to"] not in CLOSED_STATUSES:
+            self.status_since[order_id] = [change["to"], at]
+
+    def events(self, order_id: str) -> List[dict]:
+        offsets = list(self.offsets.get(order_id, ()))
+        if not offsets:
+            return []
+        with open(self.path, "rb") as f:
+            events = []
+            for offset in offsets:
+                f.seek(offset)
+                events.append(json.loads(f.readline()))
+        return events
+
+    def snapshot_due(self) -> bool:
+        return self.count - self.snapshot_count >= EVENT_SNAPSHOT_EVERY
+
+    def dump_snapshot(self, f):
+        with self.lock:
+            json.dump({
+                "size": self.size,
+                "count": self.count,
+                "offsets": self.offsets,
+                "status_since": self.status_since,
+                "time_in_status": {
+                    status_value: {"counts": h.counts, "sum": h.sum, "count": h.count}
+                    for status_value, h in self.time_in_status.items()
+                },
+            }, f)
+            self.snapshot_count = self.count
+
+    def durations(self) -> List[StatusDuration]:
+        return [
+            StatusDuration(
+                status=status_value,
+                count=h.count,
+                avg_hours=round(h.sum / h.count, 2) if h.count else None,
+                p50_hours=_round_or_none(_histogram_quantile(h, 0.5)),
+                p90_hours=_round_or_none(_histogram_quantile(h, 0.9)),
+                p99_hours=_round_or_none(_histogram_quantile(h, 0.99)),
+            )
+            for status_value, h in self.time_in_status.items()
+        ]
+
 # ==================== BANCO DE DADOS SIMULADO ====================
 
 class Database:
-    def __init__(self):
+    def __init__(self, data_dir: Path = DATA_DIR, condo_id: Optional[str] = None):
+        self.data_dir = data_dir
+        self.condo_id = condo_id
         self.users: List[User] = []
         self.orders: List[Order] = []
         self.comments: List[Comment] = []
         self.notifications: List[Notification] = []
+        self.rollups = Rollups()
+        self.orders_by_created = TimeIndex()
+        self.orders_by_completed = TimeIndex()
+        self.orders_by_id: Dict[str, Order] = {}
+        self.comments_by_order: Dict[str, List[Comment]] = {}
+        self.notifications_by_order: Dict[str, List[Notification]] = {}
+        self.order_activity: Dict[str, dict] = {}
+        self.order_json = EncodedCache(ORDER_JSON_CACHE_SIZE, _encode_order_summary)
+        self.snapshots: List[Snapshot] = []
+        self.journal = Journal(data_dir / "journal.jsonl")
+        self.history = OrderHistory(data_dir / "events.jsonl", data_dir / "events.snapshot.json")
+        # Sequência do journal já refletida nos arquivos; _save_data e backup a disputam
+        self.saved_seq = 0
+        self._save_lock = threading.Lock()
+        self.sla = DeadlineScheduler(sla_wakeup)
+        self.work_queues = WorkQueues()
+        self.duplicates = DuplicateIndex()
+        self.archive = Archive(data_dir / "archive")
+        self.users_by_id: Dict[str, User] = {}
+        self.users_by_role: Dict[UserRole, List[User]] = {}
+        self.ready = False
+
+    def load(self, read_only: bool = False):
+        """Carrega a base do disco e monta os índices (chamado uma vez, no startup).
+
+        Com `read_only` nada é gravado: sem dados iniciais e sem cortar gravações
+        interrompidas do journal e do histórico (usado pelas ferramentas de conferência).
+        """
+        if self.ready:
+            return
+        self.archive.load()
+        self.journal.load(truncate=not read_only)
+        self.history.load(truncate=not read_only)
+        self.saved_seq = self.journal.seq
         self._load_data()
-        self._seed_data()
+        if not read_only:
+            self._seed_data()
+        self._build_indexes()
+        self.ready = True
     
     def _load_data(self):
         try:
-            if (DATA_DIR / "users.json").exists():
-                with open(DATA_DIR / "users.json", "r") as f:
+            if (self.data_dir / "users.json").exists():
+                with open(self.data_dir / "users.json", "r") as f:
                     data = json.load(f)
                     self.users = [User(**u) for u in data]
-            if (DATA_DIR / "orders.json").exists():
-                with open(DATA_DIR / "orders.json", "r") as f:
+            if (self.data_dir / "orders.json").exists():
+                with open(self.data_dir / "orders.json", "r") as f:
                     data = json.load(f)
                     self.orders = [Order(**o) for o in data]
-            if (DATA_DIR / "comments.json").exists():
-                with open(DATA_DIR / "comments.json", "r") as f:
+            if (self.data_dir / "comments.json").exists():
+                with open(self.data_dir / "comments.json", "r") as f:
                     data = json.load(f)
                     self.comments = [Comment(**c) for c in data]
-            if (DATA_DIR / "notifications.json").exists():
-                with open(DATA_DIR / "notifications.json", "r") as f:
+            if (self.data_dir / "notifications.json").exists():
+                with open(self.data_dir / "notifications.json", "r") as f:
                     data = json.load(f)
                     self.notifications = [Notification(**n) for n in data]
+            # Uma interrupção no meio do arquivamento pode deixar a ordem nos dois lugares
+            if len(self.archive):
+                self.orders = [o for o in self.orders if o.id not in self.archive]
+            if (self.data_dir / "rollups.json").exists():
+                with open(self.data_dir / "rollups.json", "r") as f:
+                    self.rollups.buckets = json.load(f)
+            else:
+                self.rollups.rebuild(self.orders)
+                for order in self.archive.iter_orders():
+                    self.rollups.add(order)
         except Exception as e:
             print(f"Erro ao carregar dados: {e}")
     
     def _save_data(self):
+        start = time.perf_counter()
+        written = 0
         try:
-            with open(DATA_DIR / "users.json", "w") as f:
-                json.dump([u.model_dump() for u in self.users], f, default=str, indent=2)
-            with open(DATA_DIR / "orders.json", "w") as f:
-                json.dump([o.model_dump() for o in self.orders], f, default=str, indent=2)
-            with open(DATA_DIR / "comments.json", "w") as f:
-                json.dump([c.model_dump() for c in self.comments], f, default=str, indent=2)
-            with open(DATA_DIR / "notifications.json", "w") as f:
-                json.dump([n.model_dump() for n in self.notifications], f, default=str, indent=2)
+            with self._save_lock:
+                seq = self.journal.seq
+                for name, items in (
+                    ("users.json", [u.model_dump() for u in self.users]),
+                    ("orders.json", [o.model_dump() for o in self.orders]),
+                    ("comments.json", [c.model_dump() for c in self.comments]),
+                    ("notifications.json", [n.model_dump() for n in self.notifications]),
+                ):
+                    written += self._write_file(name, lambda f: json.dump(items, f, default=str, indent=2))
+                written += self._write_file("rollups.json", lambda f: json.dump(self.rollups.buckets, f))
+                if self.history.snapshot_due():
+                    written += self._write_file("events.snapshot.json", self.history.dump_snapshot)
+                self.saved_seq = seq
         except Exception as e:
             print(f"Erro ao salvar dados: {e}")
+        finally:
+            metrics.observe("condoos_save_data_duration_seconds", time.perf_counter() - start)
+            metrics.inc("condoos_save_data_bytes_total", written)
+            metrics.set("condoos_save_data_last_bytes", written)
+
+    def compact_journal(self) -> int:
+        """Corta do journal o que os arquivos da base já refletem (até saved_seq)"""
+        with self._save_lock:
+            return self.journal.discard_through(self.saved_seq)
+
+    def _write_file(self, name: str, dump) -> int:
+        """Grava via arquivo temporário + os.replace: quem já abriu o arquivo segue vendo a versão inteira"""
+        tmp_path = self.data_dir / (name + ".tmp")
+        with open(tmp_path, "w") as f:
+            dump(f)
+            size = f.tell()
+        os.replace(tmp_path, self.data_dir / name)
+        return size
+
+    def _build_indexes(self):
+        """Reconstrói os índices em memória a partir das coleções carregadas"""
+        self.users_by_id = {u.id: u for u in self.users}
+        self.users_by_role = {role: [] for role in UserRole}
+        for u in self.users:
+            self.users_by_role[u.role].append(u)
+        self.orders_by_created.rebuild((o.created_at, o) for o in self.orders)
+        self.orders_by_completed.rebuild(
+            (o.completed_at, o) for o in self.orders if _is_completed(o)
+        )
+        self.orders_by_id = {o.id: o for o in self.orders}
+        self.order_json.clear()
+        self.duplicates.rebuild(self.orders)
+        self.comments_by_order = {}
+        # O autor da última alteração só é conhecido para o que acontece após o startup;
+        # numa reconstrução posterior (arquivamento) as ordens que ficam o mantêm
+        previous = self.order_activity
+        self.order_activity = {}
+        for o in self.orders:
+            last = previous.get(o.id)
+            self.order_activity[o.id] = {
+                "public_comments": 0,
+                "internal_comments": 0,
+                "at": last["at"] if last else o.updated_at,
+                "by": last["by"] if last else None,
+            }
+        for c in self.comments:
+            self.comments_by_order.setdefault(c.order_id, []).append(c)
+            self._count_comment(c)
+        self._index_notifications()
+        self.sla.rebuild((o.id, deadline) for o in self.orders if (deadline := _sla_deadline(o)))
+        self.work_queues.rebuild(self.orders)
+
+    def _index_notifications(self):
+        self.notifications_by_order = {}
+        for n in self.notifications:
+            if n.order_id:
+                self.notifications_by_order.setdefault(n.order_id, []).append(n)
+
+    def add_user(self, user: User):
+        self.journal.put("user", [user])
+        self.users.append(user)
+        self.users_by_id[user.id] = user
+        self.users_by_role[user.role].append(user)
+
+    def users_with_roles(self, roles: List[UserRole]) -> List[User]:
+        return [u for role in roles for u in self.users_by_role[role]]
+
+    def add_notifications(self, notifications: List[Notification]):
+        self.journal.put("notification", notifications)
+        self.notifications.extend(notifications)
+        for n in notifications:
+            if n.order_id:
+                self.notifications_by_order.setdefault(n.order_id, []).append(n)
+
+    def add_comment(self, comment: Comment):
+        self.journal.put("comment", [comment])
+        self.comments.append(comment)
+        self.comments_by_order.setdefault(comment.order_id, []).append(comment)
+        self._count_comment(comment)
+
+    def _count_comment(self, comment: Comment):
+        activity = self.order_activity.get(comment.order_id)
+        if activity is None:
+            return
+        activity["internal_comments" if comment.is_internal else "public_comments"] += 1
+        if comment.created_at >= activity["at"]:
+            activity["at"] = comment.created_at
+            activity["by"] = comment.user_name
+
+    def mark_notifications_read(self, notifications: List[Notification]):
+        for n in notifications:
+            n.read = True
+        if notifications:
+            self.journal.put("notification", notifications)
+
+    def record_activity(self, order: Order, user_name: str):
+        """Registra quem alterou a ordem por último (chamado após order_update)"""
+        activity = self.order_activity[order.id]
+        activity["at"] = order.updated_at
+        activity["by"] = user_name
+
+    def add_order(self, order: Order):
+        """Insere uma nova ordem e atualiza agregados e índices"""
+        seq = self.journal.put("order", [order])
+        self.history.append({
+            "seq": seq, "order_id": order.id, "type": "created", "at": order.created_at,
+            "actor_id": order.requester_id, "actor_name": order.requester_name,
+            "changes": _order_changes(None, order),
+        })
+        self.orders.append(order)
+        self.rollups.add(order)
+        self.orders_by_created.add(order.created_at, order)
+        if _is_completed(order):
+            self.orders_by_completed.add(order.completed_at, order)
+        self.orders_by_id[order.id] = order
+        self.order_activity[order.id] = {
+            "public_comments": 0, "internal_comments": 0, "at": order.created_at, "by": order.requester_name
+        }
+        if deadline := _sla_deadline(order):
+            self.sla.schedule(order.id, deadline)
+        self.work_queues.update(order)
+        if _duplicate_eligible(order):
+            self.duplicates.add(order)
+
+    def archive_closed_orders(self, older_than_days: int) -> dict:
+        """Move ordens fechadas há mais de N dias (com comentários e notificações) para o arquivo"""
+        cutoff = datetime.now() - timedelta(days=older_than_days)
+        archived_ids = {
+            o.id for o in self.orders
+            if (closed_at := _closed_at(o)) is not None and closed_at <= cutoff
+        }
+        if not archived_ids:
+            return {"orders": 0, "comments": 0, "notifications": 0, "segment": None}
+        
+        records = {
+            o.id: {"order": o.model_dump(mode="json"), "comments": [], "notifications": []}
+            for o in self.orders if o.id in archived_ids
+        }
+        for c in self.comments:
+            if c.order_id in archived_ids:
+                records[c.order_id]["comments"].append(c.model_dump(mode="json"))
+        for n in self.notifications:
+            if n.order_id in archived_ids:
+                records[n.order_id]["notifications"].append(n.model_dump(mode="json"))
+        segment = self.archive.append_segment(list(records.values()))
+        self.journal.append("archive", "order", ids=sorted(archived_ids))
+        
+        comments_before, notifications_before = len(self.comments), len(self.notifications)
+        self.orders = [o for o in self.orders if o.id not in archived_ids]
+        self.comments = [c for c in self.comments if c.order_id not in archived_ids]
+        self.notifications = [n for n in self.notifications if n.order_id not in archived_ids]
+        self._build_indexes()
+        self._save_data()
+        
+        return {
+            "orders": len(archived_ids),
+            "comments": comments_before - len(self.comments),
+            "notifications": notifications_before - len(self.notifications),
+            "segment": segment,
+        }
+
+    def compact_notifications(self, read_ttl_days: int, max_per_user: int) -> dict:
+        """Remove notificações lidas expiradas e o excedente por usuário (mais antigas primeiro)"""
+        cutoff = datetime.now() - timedelta(days=read_ttl_days)
+        kept = [n for n in self.notifications if not (n.read and n.created_at < cutoff)]
+        expired = len(self.notifications) - len(kept)
+        
+        per_user: Dict[str, int] = {}
+        trimmed = []
+        for n in sorted(kept, key=lambda x: x.created_at, reverse=True):
+            per_user[n.user_id] = per_user.get(n.user_id, 0) + 1
+            if per_user[n.user_id] <= max_per_user:
+                trimmed.append(n)
+        over_limit = len(kept) - len(trimmed)
+        
+        path = self.data_dir / "notifications.json"
+        bytes_before = path.stat().st_size if path.exists() else 0
+        bytes_after = bytes_before
+        if expired or over_limit:
+            kept_ids = {n.id for n in trimmed}
+            self.journal.append(
+                "delete", "notification", ids=[n.id for n in self.notifications if n.id not in kept_ids]
+            )
+            trimmed.reverse()
+            self.notifications = trimmed
+            self._index_notifications()
+            self._save_data()
+            bytes_after = path.stat().st_size
+        
+        return {
+            "evicted": expired + over_limit,
+            "expired": expired,
+            "over_limit": over_limit,
+            "remaining": len(self.notifications),
+            "bytes_reclaimed": max(bytes_before - bytes_after, 0),
+        }
+
+    @contextmanager
+    def order_update(self, order: Order, actor: Optional[User] = None):
+        """Envolve alterações in-place de uma ordem, mantendo agregados, índices e histórico em dia
+
+        Sem `actor`, a alteração é registrada como feita pelo sistema.
+        """
+        before = order.model_copy(update={"photos": list(order.photos)})
+        for snapshot in self.snapshots:
+            snapshot.preserve(before)
+        try:
+            yield order
+        finally:
+            seq = self.journal.put("order", [order])
+            if changes := _order_changes(before, order):
+                self.history.append({
+                    "seq": seq, "order_id": order.id, "type": "updated", "at": datetime.now(),
+                    "actor_id": actor.id if actor else None, "actor_name": actor.name if actor else None,
+                    "changes": changes,
+                })
+            self.rollups.remove(before)
+            self.rollups.add(order)
+            if _is_completed(before):
+                self.orders_by_completed.remove(before.completed_at, before)
+            if _is_completed(order):
+                self.orders_by_completed.add(order.completed_at, order)
+            deadline = _sla_deadline(order)
+            if deadline != _sla_deadline(before):
+                if deadline:
+                    self.sla.schedule(order.id, deadline)
+                else:
+                    self.sla.cancel(order.id)
+            self.work_queues.update(order)
+            self.duplicates.update(order, before)
+            self.order_json.invalidate(order.id)
+
+    @contextmanager
+    def snapshot(self, orders: Optional[list] = None):
+        """Fixa um Snapshot das ordens (todas as ativas, por padrão) enquanto o bloco durar"""
+        snapshot = Snapshot(self.orders if orders is None else orders)
+        self.snapshots.append(snapshot)
+        try:
+            yield snapshot
+        finally:
+            self.snapshots.remove(snapshot)
+
+    def escalate_overdue(self) -> List[Order]:
+        """Escala a prioridade das ordens com prazo vencido e marca o estouro do SLA"""
+        now = datetime.now()
+        breached = []
+        for order_id in self.sla.pop_due(time.time()):
+            order = self.orders_by_id.get(order_id)
+            if order is None:
+                continue
+            with self.order_update(order):
+                order.priority = PRIORITY_ESCALATION[order.priority]
+                order.sla_breached_at = now
+                order.updated_at = now
+            breached.append(order)
+        return breached
     
+    def backup(self, fileobj) -> dict:
+        """Grava em `fileobj` um backup consistente (tar.gz), sem pausar as escritas.
+
+        Sob a trava de gravação apenas se abrem os arquivos: como _save_data os
+        substitui via os.replace, os descritores abertos continuam vendo a versão
+        da sequência `saved_seq`. O journal segue junto (até onde estava nesse
+        instante) para a restauração poder avançar a partir dali. Compressão e
+        fotos ficam fora da trava.
+        """
+        import tarfile
+        start = time.perf_counter()
+        sources = []
+        try:
+            with self._save_lock, self.journal.lock, self.history.lock:
+                seq = self.saved_seq
+                paths = [(name, self.data_dir / name) for name in (
+                    "users.json", "orders.json", "comments.json", "notifications.json", "rollups.json",
+                    "journal.jsonl", "events.jsonl", "events.snapshot.json"
+                )]
+                paths += [
+                    (f"archive/{name}", self.archive.directory / name)
+                    for name in ["manifest.json"] + [segment["name"] for segment in self.archive.segments]
+                ]
+                for name, path in paths:
+                    if path.exists():
+                        f = open(path, "rb")
+                        sources.append((name, f, os.fstat(f.fileno()).st_size))
+            
+            photos = {p for o in list(self.orders) for p in o.photos}
+            for segment in self.archive.segments:
+                for record in self.archive.read_segment(segment["name"]):
+                    photos.update(record["order"]["photos"])
+            uploads = sorted(
+                name for p in photos
+                if (UPLOAD_DIR / (name := p.rsplit("/", 1)[-1])).is_file()
+            )
+            meta = {
+                "seq": seq,
+                "created_at": datetime.now().isoformat(),
+                "condo_id": self.condo_id,
+                "files": [name for name, _, _ in sources],
+                "uploads": len(uploads),
+            }
+            
+            # Nível 1: o gargalo com bases grandes é a compressão, não o tamanho final
+            with tarfile.open(fileobj=fileobj, mode="w:gz", compresslevel=1) as tar:
+                encoded = json.dumps(meta, indent=2).encode()
+                info = tarfile.TarInfo("backup.json")
+                info.size, info.mtime = len(encoded), time.time()
+                tar.addfile(info, io.BytesIO(encoded))
+                for name, f, size in sources:
+                    info = tarfile.TarInfo(name)
+                    info.size, info.mtime = size, time.time()
+                    tar.addfile(info, f)
+                for name in uploads:
+                    tar.add(UPLOAD_DIR / name, arcname=f"uploads/{name}")
+        finally:
+            for _, f, _ in sources:
+                f.close()
+        metrics.observe("condoos_backup_duration_seconds", time.perf_counter() - start)
+        return meta
+
     def _seed_data(self):
-        """Cria dados iniciais se não existirem"""
-        if not self.users:
+        """Cria dados iniciais se não existirem (só na partição padrão)"""
+        # Partições de condomínio nunca recebem as contas de demonstração
+        if not self.users and self.condo_id is None:
             # Usuários de teste
             self.users = [
                 User(
@@ -225,7 +2105,8 @@ class Database:
                     email="admin@condo.com",
                     role=UserRole.ADMIN,
                     created_at=datetime.now(),
-                    password="admin123"
+                    password="admin123",
+                    condo_id=self.condo_id
                 ),
                 User(
                     id="2",
@@ -234,7 +2115,8 @@ class Database:
                     role=UserRole.SINDICO,
                     phone="(11) 99999-1111",
                     created_at=datetime.now(),
-                    password="sindico123"
+                    password="sindico123",
+                    condo_id=self.condo_id
                 ),
                 User(
                     id="3",
@@ -244,7 +2126,8 @@ class Database:
                     apartment="101A",
                     phone="(11) 99999-2222",
                     created_at=datetime.now(),
-                    password="morador123"
+                    password="morador123",
+                    condo_id=self.condo_id
                 ),
                 User(
                     id="4",
@@ -253,12 +2136,245 @@ class Database:
                     role=UserRole.FUNCIONARIO,
                     phone="(11) 99999-3333",
                     created_at=datetime.now(),
-                    password="func123"
+                    password="func123",
+                    condo_id=self.condo_id
                 ),
             ]
             self._save_data()
 
-db = Database()
+# ==================== CONDOMÍNIOS (MULTI-TENANT) ====================
+
+CONDO_ID_PATTERN = re.compile(r"[A-Za-z0-9_-]{1,64}")
+
+# Condomínio da requisição em andamento (None = partição padrão, em DATA_DIR)
+current_condo: ContextVar[Optional[str]] = ContextVar("current_condo", default=None)
+
+metrics.describe("condoos_condos_loaded", "gauge", "Partições de condomínio carregadas em memória")
+metrics.describe("condoos_condo_loads_total", "counter", "Partições de condomínio carregadas do disco")
+metrics.describe("condoos_condo_evictions_total", "counter", "Partições de condomínio descartadas por LRU")
+
+class Tenants:
+    """Uma instância de Database por condomínio, carregada no primeiro acesso.
+
+    Cada partição tem seus próprios arquivos, índices, agregados e arquivo de
+    ordens fechadas. Acima de `max_loaded` as partições ociosas (sem requisições
+    em andamento) menos usadas saem da memória; como cada escrita já foi
+    persistida por _save_data, descartar não perde nada.
+    """
+
+    def __init__(self, max_loaded: int):
+        self.default = Database()
+        self.max_loaded = max_loaded
+        self._loaded: OrderedDict = OrderedDict()
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._active: Dict[str, int] = {}
+
+    def __len__(self):
+        return len(self._loaded)
+
+    def exists(self, condo_id: str) -> bool:
+        return CONDO_ID_PATTERN.fullmatch(condo_id) is not None and (CONDOS_DIR / condo_id).is_dir()
+
+    def get(self, condo_id: Optional[str]) -> Database:
+        return self.default if condo_id is None else self._loaded[condo_id]
+
+    def peek(self, condo_id: Optional[str]) -> Optional[Database]:
+        """A partição, se já estiver em memória (não carrega nem muda a ordem do LRU)"""
+        return self.default if condo_id is None else self._loaded.get(condo_id)
+
+    def loaded(self) -> List[tuple]:
+        """(condo_id, Database) de todas as partições em memória, a padrão primeiro"""
+        return [(None, self.default)] + list(self._loaded.items())
+
+    async def acquire(self, condo_id: str) -> Database:
+        """Carrega a partição se preciso e a marca em uso até o release"""
+        partition = self._loaded.get(condo_id)
+        if partition is None:
+            # Requisições simultâneas ao mesmo condomínio esperam a mesma carga
+            task = self._loading.get(condo_id)
+            if task is None:
+                task = self._loading[condo_id] = asyncio.create_task(self._load(condo_id))
+            partition = await asyncio.shield(task)
+        self._loaded.move_to_end(condo_id)
+        self._active[condo_id] = self._active.get(condo_id, 0) + 1
+        self._evict_idle()
+        return partition
+
+    def release(self, condo_id: str):
+        self._active[condo_id] -= 1
+        if not self._active[condo_id]:
+            del self._active[condo_id]
+
+    async def _load(self, condo_id: str) -> Database:
+        try:
+            partition = Database(CONDOS_DIR / condo_id, condo_id)
+            await asyncio.to_thread(partition.load)
+            self._loaded[condo_id] = partition
+            # Prazos da partição recém-carregada entram no cálculo do timer
+            sla_wakeup.set()
+            metrics.inc("condoos_condo_loads_total")
+            return partition
+        finally:
+            del self._loading[condo_id]
+
+    def _evict_idle(self):
+        for condo_id in list(self._loaded):
+            if len(self._loaded) <= self.max_loaded:
+                break
+            if condo_id not in self._active:
+                del self._loaded[condo_id]
+                metrics.inc("condoos_condo_evictions_total")
+
+class CurrentDatabase:
+    """Encaminha `db.<atributo>` para a partição do condomínio da requisição atual"""
+
+    def __getattr__(self, name):
+        return getattr(tenants.get(current_condo.get()), name)
+
+    def __setattr__(self, name, value):
+        setattr(tenants.get(current_condo.get()), name, value)
+
+tenants = Tenants(MAX_LOADED_CONDOS)
+db = CurrentDatabase()
+
+@contextmanager
+def condo_context(condo_id: Optional[str]):
+    """Executa o bloco com `db` apontando para a partição do condomínio"""
+    token = current_condo.set(condo_id)
+    try:
+        yield tenants.get(condo_id)
+    finally:
+        current_condo.reset(token)
+
+@metrics.collector
+def _collect_condos_loaded():
+    metrics.set("condoos_condos_loaded", len(tenants))
+
+def _token_user_id(token: str) -> str:
+    # Tokens de condomínio têm a forma token_<condo_id>:<user_id>
+    return token.removeprefix("token_").rpartition(":")[2]
+
+def _token_condo(token: str) -> Optional[str]:
+    token = token.removeprefix("token_")
+    return token.partition(":")[0] if ":" in token else None
+
+def _bearer_token(authorization: str) -> Optional[str]:
+    """Credencial de um header Authorization "Bearer ..." (esquema em qualquer caixa, como o HTTPBearer)"""
+    scheme, _, credentials = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not credentials.strip():
+        return None
+    return credentials.strip()
+
+def _request_condo(scope) -> Optional[str]:
+    """Condomínio do token ou, apenas no login, do header X-Condo-Id.
+
+    Um token sem condomínio identifica um usuário da partição padrão; junto com
+    X-Condo-Id ele seria resolvido em outra partição, então levanta ValueError.
+    """
+    token = header = None
+    for key, value in scope["headers"]:
+        if key == b"authorization":
+            token = _bearer_token(value.decode("latin-1"))
+        elif key == b"x-condo-id":
+            header = value.decode("latin-1")
+    if token is not None and (condo_id := _token_condo(token)) is not None:
+        return condo_id
+    if header is None:
+        return None
+    if token is not None:
+        raise ValueError("token sem condomínio")
+    return header if scope["path"] == "/api/auth/login" else None
+
+class TenantMiddleware:
+    """Resolve o condomínio da requisição e garante a partição carregada durante ela"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        try:
+            condo_id = _request_condo(scope) if scope["type"] == "http" and scope["path"].startswith("/api/") else None
+        except ValueError:
+            response = JSONResponse({"detail": "X-Condo-Id não vale para este token"}, status_code=400)
+            await response(scope, receive, send)
+            return
+        if condo_id is None:
+            await self.app(scope, receive, send)
+            return
+        if not tenants.exists(condo_id):
+            response = JSONResponse({"detail": "Condomínio não encontrado"}, status_code=404)
+            await response(scope, receive, send)
+            return
+        await tenants.acquire(condo_id)
+        try:
+            with condo_context(condo_id):
+                await self.app(scope, receive, send)
+        finally:
+            tenants.release(condo_id)
+
+async def _load_database():
+    """Carrega a base fora do event loop e emite o relatório de inicialização"""
+    start = time.perf_counter()
+    await asyncio.to_thread(db.load)
+    startup_phases["data"] = round((time.perf_counter() - start) * 1000, 1)
+    print("Inicialização: " + ", ".join(f"{phase} {ms} ms" for phase, ms in startup_phases.items()))
+    if os.environ.get("CONDOOS_IMPORTTIME_REPORT") == "1":
+        digest = await asyncio.to_thread(import_time_digest)
+        print("Imports mais lentos (-X importtime, acumulado):")
+        for module, ms in digest:
+            print(f"  {ms:>8.1f} ms  {module}")
+
+def import_time_digest(top: int = 15) -> List[tuple]:
+    """Roda `python -X importtime -c "import main"` e devolve os módulos mais caros (acumulado)"""
+    import subprocess
+    backend_dir = os.path.dirname(os.path.abspath(__file__))
+    python_path = os.pathsep.join(filter(None, [backend_dir, os.environ.get("PYTHONPATH")]))
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import main"],
+        env={**os.environ, "PYTHONPATH": python_path},
+        capture_output=True,
+        text=True
+    )
+    modules = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        modules.append((name.strip(), int(cumulative) / 1000))
+    return sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+
+class ReadinessMiddleware:
+    """Responde 503 nas rotas da API enquanto a base ainda está carregando"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (
+            scope["type"] == "http"
+            and not db.ready
+            and scope["path"].startswith("/api/")
+            and scope["path"] not in ("/api/health", "/api/metrics")
+        ):
+            response = JSONResponse({"detail": "Serviço iniciando"}, status_code=503, headers={"Retry-After": "1"})
+            await response(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
+
+# O último registrado é o mais externo. De fora para dentro: CORS (também nas
+# respostas 429/400/404/503 dos internos), métricas (que as contam), limite de
+# requisições (antes de qualquer carga de partição), condomínio, prontidão e profiling.
+app.add_middleware(ReadinessMiddleware)
+app.add_middleware(TenantMiddleware)
+app.add_middleware(RateLimitMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["*"],
+    allow_credentials=True,
+    allow_methods=["*"],
+    allow_headers=["*"],
+)
 
 # ==================== AUTENTICAÇÃO ====================
 
@@ -269,8 +2385,8 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     token = credentials.credentials
     # Em produção, validar JWT corretamente
     try:
-        user_id = token.replace("token_", "")
-        user = next((u for u in db.users if u.id == user_id), None)
+        user_id = _token_user_id(token)
+        user = db.users_by_id.get(user_id)
         if not user:
             raise HTTPException(status_code=401, detail="Token inválido")
         return user
@@ -295,7 +2411,7 @@ async def login(credentials: UserLogin):
         raise HTTPException(status_code=401, detail="Credenciais inválidas")
     
     # Em produção, gerar JWT real
-    token = f"token_{user.id}"
+    token = f"token_{user.id}" if user.condo_id is None else f"token_{user.condo_id}:{user.id}"
     
     return {
         "token": token,
@@ -306,7 +2422,8 @@ async def login(credentials: UserLogin):
             role=user.role,
             apartment=user.apartment,
             phone=user.phone,
-            created_at=user.created_at
+            created_at=user.created_at,
+            condo_id=user.condo_id
         )
     }
 
@@ -320,7 +2437,8 @@ async def get_me(user: User = Depends(get_current_user)):
         role=user.role,
         apartment=user.apartment,
         phone=user.phone,
-        created_at=user.created_at
+        created_at=user.created_at,
+        condo_id=user.condo_id
     )
 
 # ==================== ENDPOINTS DE USUÁRIOS ====================
@@ -333,7 +2451,7 @@ async def list_users(
     """Lista usuários (apenas admin e síndico)"""
     users = db.users
     if role:
-        users = [u for u in users if u.role == role]
+        users = db.users_by_role[role]
     return [
         UserResponse(
             id=u.id,
@@ -342,7 +2460,8 @@ async def list_users(
             role=u.role,
             apartment=u.apartment,
             phone=u.phone,
-            created_at=u.created_at
+            created_at=u.created_at,
+            condo_id=u.condo_id
         ) for u in users
     ]
 
@@ -356,16 +2475,17 @@ async def create_user(
         raise HTTPException(status_code=400, detail="Email já cadastrado")
     
     new_user = User(
-        id=str(len(db.users) + 1),
+        id=new_id(),
         name=user_data.name,
         email=user_data.email,
         role=user_data.role,
         apartment=user_data.apartment,
         phone=user_data.phone,
         created_at=datetime.now(),
-        password=user_data.password
+        password=user_data.password,
+        condo_id=db.condo_id
     )
-    db.users.append(new_user)
+    db.add_user(new_user)
     db._save_data()
     
     return UserResponse(
@@ -375,21 +2495,35 @@ async def create_user(
         role=new_user.role,
         apartment=new_user.apartment,
         phone=new_user.phone,
-        created_at=new_user.created_at
+        created_at=new_user.created_at,
+        condo_id=new_user.condo_id
     )
 
 # ==================== ENDPOINTS DE ORDENS ====================
 
-@app.get("/api/orders", response_model=List[Order])
+@app.get("/api/orders", response_model=List[OrderSummary])
 async def list_orders(
     status: Optional[OrderStatus] = None,
     category: Optional[Category] = None,
     priority: Optional[Priority] = None,
     search: Optional[str] = None,
+    start_date: Optional[datetime] = None,
+    end_date: Optional[datetime] = None,
+    include_archived: bool = False,
+    include_activity: bool = False,
     user: User = Depends(get_current_user)
 ):
-    """Lista ordens de serviço com filtros"""
+    """Lista ordens de serviço com filtros (e, opcionalmente, comentários e última atividade)"""
     orders = db.orders
+    start_date, end_date = _local_naive(start_date), _local_naive(end_date)
+    
+    # Janela de criação resolvida pelo índice ordenado
+    if start_date or end_date:
+        orders = db.orders_by_created.range(start_date, end_date)
+    
+    # Segmentos do arquivo só são lidos quando pedidos
+    if include_archived:
+        orders = chain(orders, db.archive.iter_orders(start_date, end_date))
     
     # Moradores só veem suas próprias ordens
     if user.role == UserRole.MORADOR:
@@ -405,12 +2539,36 @@ async def list_orders(
         search_lower = search.lower()
         orders = [o for o in orders if search_lower in o.title.lower() or search_lower in o.description.lower()]
     
-    return sorted(orders, key=lambda x: x.created_at, reverse=True)
+    orders = sorted(orders, key=lambda x: x.created_at, reverse=True)
+    if include_activity:
+        return [_order_summary(o, user) for o in orders]
+    if ORDER_JSON_CACHE_SIZE > 0:
+        # Mesmo corpo que o response_model produziria, montado a partir do cache
+        body = b"[" + b",".join([db.order_json.get(o) for o in orders]) + b"]"
+        return Response(body, media_type="application/json")
+    return orders
+
+def _order_summary(order: Order, user: User) -> OrderSummary:
+    """Acrescenta os contadores mantidos pelo Database (O(1) por ordem)"""
+    activity = db.order_activity.get(order.id)
+    if activity is None:
+        # Ordens arquivadas não têm contadores em memória
+        return OrderSummary.model_construct(**dict(order))
+    internal = None if user.role == UserRole.MORADOR else activity["internal_comments"]
+    return OrderSummary.model_construct(
+        **dict(order),
+        comment_count=activity["public_comments"] + (internal or 0),
+        internal_comment_count=internal,
+        last_activity_at=activity["at"],
+        last_activity_by=activity["by"]
+    )
 
 @app.get("/api/orders/{order_id}", response_model=Order)
 async def get_order(order_id: str, user: User = Depends(get_current_user)):
     """Retorna detalhes de uma ordem"""
-    order = next((o for o in db.orders if o.id == order_id), None)
+    order = db.orders_by_id.get(order_id)
+    if not order and order_id in db.archive:
+        order = Order(**db.archive.get(order_id)["order"])
     if not order:
         raise HTTPException(status_code=404, detail="Ordem não encontrada")
     
@@ -420,14 +2578,106 @@ async def get_order(order_id: str, user: User = Depends(get_current_user)):
     
     return order
 
-@app.post("/api/orders", response_model=Order)
+@app.get("/api/orders/{order_id}/full", response_model=OrderDetail)
+async def get_order_full(
+    order_id: str,
+    user: User = Depends(get_current_user),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Ordem, comentários visíveis, fotos e notificações do usuário numa só resposta (com ETag)"""
+    order = db.orders_by_id.get(order_id)
+    if order:
+        comments = db.comments_by_order.get(order_id, [])
+        notifications = db.notifications_by_order.get(order_id, [])
+    elif order_id in db.archive:
+        record = db.archive.get(order_id)
+        order = Order(**record["order"])
+        comments = [Comment(**c) for c in record["comments"]]
+        notifications = [Notification(**n) for n in record["notifications"]]
+    else:
+        raise HTTPException(status_code=404, detail="Ordem não encontrada")
+    
+    if user.role == UserRole.MORADOR:
+        if order.requester_id != user.id:
+            raise HTTPException(status_code=403, detail="Acesso negado")
+        comments = [c for c in comments if not c.is_internal]
+    
+    detail = OrderDetail(
+        order=order,
+        comments=sorted(comments, key=lambda x: x.created_at),
+        photos=order.photos,
+        notifications=sorted(
+            (n for n in notifications if n.user_id == user.id),
+            key=lambda x: x.created_at,
+            reverse=True
+        )
+    )
+    body = detail.model_dump_json().encode()
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    if if_none_match == etag:
+        return Response(status_code=304, headers={"ETag": etag})
+    return Response(body, media_type="application/json", headers={"ETag": etag})
+
+@app.get("/api/orders/{order_id}/history", response_model=List[OrderEvent])
+async def get_order_history(order_id: str, user: User = Depends(get_current_user)):
+    """Linha do tempo da ordem: cada alteração, com autor, instante e valores anterior/novo"""
+    order = db.orders_by_id.get(order_id)
+    if not order and order_id in db.archive:
+        order = Order(**db.archive.get(order_id)["order"])
+    if not order:
+        raise HTTPException(status_code=404, detail="Ordem não encontrada")
+    
+    if user.role == UserRole.MORADOR and order.requester_id != user.id:
+        raise HTTPException(status_code=403, detail="Acesso negado")
+    
+    return db.history.events(order_id)
+
+def build_notifications(
+    user_ids: List[str],
+    title: str,
+    message: str,
+    order_id: Optional[str] = None
+) -> List[Notification]:
+    """Monta uma notificação por destinatário, com o mesmo texto e o mesmo instante"""
+    now = datetime.now()
+    # Os campos já são válidos por construção, então pula a validação do pydantic
+    return [
+        Notification.model_construct(
+            id=new_id(now),
+            user_id=user_id,
+            title=title,
+            message=message,
+            order_id=order_id,
+            read=False,
+            created_at=now
+        )
+        for user_id in user_ids
+    ]
+
+async def _notify_staff_new_order(requester_name: str, order: Order):
+    """Avisa síndicos e admins sobre uma nova ordem (executado após a resposta).
+
+    É async para rodar no event loop, como as demais escritas: uma função
+    comum iria para o pool de threads e disputaria as coleções e o _save_data.
+    """
+    staff = db.users_with_roles([UserRole.SINDICO, UserRole.ADMIN])
+    db.add_notifications(build_notifications(
+        [u.id for u in staff],
+        title="Nova Ordem de Serviço",
+        message=f"{requester_name} criou uma nova OS: {order.title}",
+        order_id=order.id
+    ))
+    db._save_data()
+
+@app.post("/api/orders", response_model=OrderCreated)
 async def create_order(
     order_data: OrderCreate,
+    background_tasks: BackgroundTasks,
     user: User = Depends(get_current_user)
 ):
     """Cria nova ordem de serviço"""
     new_order = Order(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         title=order_data.title,
         description=order_data.description,
         category=order_data.category,
@@ -439,27 +2689,17 @@ async def create_order(
         photos=[],
         created_at=datetime.now(),
         updated_at=datetime.now(),
-        estimated_completion=order_data.estimated_completion
+        estimated_completion=order_data.estimated_completion,
+        condo_id=db.condo_id
     )
-    db.orders.append(new_order)
+    db.add_order(new_order)
     db._save_data()
     
-    # Criar notificação para síndicos e admins
-    for u in db.users:
-        if u.role in [UserRole.SINDICO, UserRole.ADMIN]:
-            notification = Notification(
-                id=str(uuid.uuid4()),
-                user_id=u.id,
-                title="Nova Ordem de Serviço",
-                message=f"{user.name} criou uma nova OS: {order_data.title}",
-                order_id=new_order.id,
-                read=False,
-                created_at=datetime.now()
-            )
-            db.notifications.append(notification)
-    db._save_data()
+    # Criar notificação para síndicos e admins depois de responder
+    background_tasks.add_task(_notify_staff_new_order, user.name, new_order)
     
-    return new_order
+    # Relatos parecidos já abertos na mesma categoria
+    return OrderCreated(**dict(new_order), duplicate_candidates=_duplicate_candidates(new_order, user))
 
 @app.post("/api/orders/{order_id}/photos")
 async def upload_photo(
@@ -468,7 +2708,7 @@ async def upload_photo(
     user: User = Depends(get_current_user)
 ):
     """Upload de foto para uma ordem"""
-    order = next((o for o in db.orders if o.id == order_id), None)
+    order = db.orders_by_id.get(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Ordem não encontrada")
     
@@ -478,14 +2718,16 @@ async def upload_photo(
     
     # Salvar arquivo
     file_ext = file.filename.split(".")[-1]
-    file_name = f"{uuid.uuid4()}.{file_ext}"
+    file_name = f"{new_id()}.{file_ext}"
     file_path = UPLOAD_DIR / file_name
     
     with open(file_path, "wb") as f:
         shutil.copyfileobj(file.file, f)
     
-    order.photos.append(f"/uploads/{file_name}")
-    order.updated_at = datetime.now()
+    with db.order_update(order, user):
+        order.photos.append(f"/uploads/{file_name}")
+        order.updated_at = datetime.now()
+    db.record_activity(order, user.name)
     db._save_data()
     
     return {"photo_url": f"/uploads/{file_name}"}
@@ -497,7 +2739,7 @@ async def update_order(
     user: User = Depends(get_current_user)
 ):
     """Atualiza uma ordem de serviço"""
-    order = next((o for o in db.orders if o.id == order_id), None)
+    order = db.orders_by_id.get(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Ordem não encontrada")
     
@@ -505,36 +2747,51 @@ async def update_order(
     if user.role == UserRole.MORADOR and order.requester_id != user.id:
         raise HTTPException(status_code=403, detail="Acesso negado")
     
-    old_status = order.status
-    
-    if update_data.status:
-        order.status = update_data.status
-        if update_data.status == OrderStatus.CONCLUIDA:
-            order.completed_at = datetime.now()
-    
-    if update_data.assigned_to:
-        if user.role not in [UserRole.ADMIN, UserRole.SINDICO]:
-            raise HTTPException(status_code=403, detail="Apenas admin/síndico pode atribuir")
-        order.assigned_to = update_data.assigned_to
-        assigned_user = next((u for u in db.users if u.id == update_data.assigned_to), None)
-        if assigned_user:
-            order.assigned_name = assigned_user.name
-    
-    if update_data.priority:
-        if user.role not in [UserRole.ADMIN, UserRole.SINDICO]:
-            raise HTTPException(status_code=403, detail="Apenas admin/síndico pode alterar prioridade")
-        order.priority = update_data.priority
+    # Campos restritos: checar antes de alterar qualquer coisa na ordem
+    staff_only = user.role in [UserRole.ADMIN, UserRole.SINDICO]
+    if update_data.assigned_to and not staff_only:
+        raise HTTPException(status_code=403, detail="Apenas admin/síndico pode atribuir")
+    if update_data.priority and not staff_only:
+        raise HTTPException(status_code=403, detail="Apenas admin/síndico pode alterar prioridade")
+    new_deadline = update_data.estimated_completion and update_data.estimated_completion != order.estimated_completion
+    if new_deadline and not staff_only:
+        raise HTTPException(status_code=403, detail="Apenas admin/síndico pode alterar o prazo")
     
-    if update_data.description:
-        order.description = update_data.description
+    old_status = order.status
     
-    order.updated_at = datetime.now()
+    with db.order_update(order, user):
+        if update_data.status:
+            order.status = update_data.status
+            if update_data.status == OrderStatus.CONCLUIDA:
+                order.completed_at = datetime.now()
+            elif update_data.status == OrderStatus.CANCELADA and old_status != OrderStatus.CANCELADA:
+                order.cancelled_at = datetime.now()
+        
+        if update_data.assigned_to:
+            order.assigned_to = update_data.assigned_to
+            assigned_user = db.users_by_id.get(update_data.assigned_to)
+            if assigned_user:
+                order.assigned_name = assigned_user.name
+        
+        if update_data.priority:
+            order.priority = update_data.priority
+        
+        if new_deadline:
+            order.estimated_completion = update_data.estimated_completion
+            # Novo prazo rearma o SLA
+            order.sla_breached_at = None
+        
+        if update_data.description:
+            order.description = update_data.description
+        
+        order.updated_at = datetime.now()
+    db.record_activity(order, user.name)
     db._save_data()
     
     # Notificar sobre mudança de status
     if old_status != order.status:
         notification = Notification(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             user_id=order.requester_id,
             title="Atualização de OS",
             message=f"Sua ordem '{order.title}' foi atualizada para: {order.status.value}",
@@ -542,22 +2799,132 @@ async def update_order(
             read=False,
             created_at=datetime.now()
         )
-        db.notifications.append(notification)
+        db.add_notifications([notification])
         db._save_data()
     
     return order
 
+# ==================== ENDPOINTS DE DUPLICADAS ====================
+
+metrics.describe(
+    "condoos_duplicate_lookup_seconds", "histogram", "Tempo da busca de duplicatas no índice LSH",
+    (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.01)
+)
+
+def _duplicate_candidates(order: Order, user: User) -> List[DuplicateCandidate]:
+    """Candidatas visíveis ao usuário: moradores só recebem as próprias ordens"""
+    start = time.perf_counter()
+    matches = db.duplicates.candidates(order)
+    metrics.observe("condoos_duplicate_lookup_seconds", time.perf_counter() - start)
+    return [
+        DuplicateCandidate(
+            order_id=other.id,
+            title=other.title,
+            status=other.status,
+            created_at=other.created_at,
+            similarity=round(similarity, 2)
+        )
+        for order_id, similarity in matches
+        if (other := db.orders_by_id.get(order_id))
+        and (user.role != UserRole.MORADOR or other.requester_id == user.id)
+    ]
+
+@app.get("/api/orders/{order_id}/duplicates", response_model=List[DuplicateCandidate])
+async def list_duplicate_candidates(
+    order_id: str,
+    user: User = Depends(require_role([UserRole.ADMIN, UserRole.SINDICO, UserRole.FUNCIONARIO]))
+):
+    """Ordens abertas da mesma categoria que parecem relatar o mesmo problema"""
+    order = db.orders_by_id.get(order_id)
+    if not order:
+        raise HTTPException(status_code=404, detail="Ordem não encontrada")
+    return _duplicate_candidates(order, user)
+
+@app.post("/api/orders/{order_id}/merge", response_model=Order)
+async def merge_duplicates(
+    order_id: str,
+    merge: MergeRequest,
+    user: User = Depends(require_role([UserRole.ADMIN, UserRole.SINDICO]))
+):
+    """Vincula ordens duplicadas à ordem principal, cancelando-as e avisando seus solicitantes"""
+    master = db.orders_by_id.get(order_id)
+    if not master:
+        raise HTTPException(status_code=404, detail="Ordem não encontrada")
+    if master.duplicate_of:
+        raise HTTPException(status_code=400, detail="A ordem principal já é duplicata de outra")
+    
+    # Valida todas antes de alterar qualquer uma
+    duplicates = []
+    for duplicate_id in dict.fromkeys(merge.duplicate_ids):
+        duplicate = db.orders_by_id.get(duplicate_id)
+        if not duplicate:
+            raise HTTPException(status_code=404, detail=f"Ordem {duplicate_id} não encontrada")
+        if duplicate.id == master.id or not _duplicate_eligible(duplicate):
+            raise HTTPException(status_code=400, detail=f"Ordem {duplicate_id} não pode ser vinculada")
+        duplicates.append(duplicate)
+    
+    now = datetime.now()
+    for duplicate in duplicates:
+        with db.order_update(duplicate, user):
+            duplicate.duplicate_of = master.id
+            duplicate.status = OrderStatus.CANCELADA
+            duplicate.cancelled_at = now
+            duplicate.updated_at = now
+        db.record_activity(duplicate, user.name)
+        db.add_notifications(build_notifications(
+            [duplicate.requester_id],
+            title="OS vinculada",
+            message=f"Sua ordem '{duplicate.title}' foi vinculada à OS '{master.title}', que seguirá com o atendimento",
+            order_id=duplicate.id
+        ))
+    db._save_data()
+    
+    return master
+
+# ==================== ENDPOINTS DA FILA DE TRABALHO ====================
+
+@app.get("/api/me/queue", response_model=List[Order])
+async def my_queue(limit: int = 20, user: User = Depends(get_current_user)):
+    """Ordens pendentes atribuídas ao usuário, por prioridade e depois por antiguidade"""
+    if limit < 1:
+        raise HTTPException(status_code=400, detail="limit inválido")
+    return [db.orders_by_id[order_id] for order_id in db.work_queues.top(user.id, limit)]
+
+@app.post("/api/me/queue/next", response_model=Order)
+async def claim_next_order(user: User = Depends(get_current_user)):
+    """Assume a próxima ordem da fila do usuário, passando-a para em andamento"""
+    next_ids = db.work_queues.top(user.id, 1)
+    if not next_ids:
+        raise HTTPException(status_code=404, detail="Nenhuma ordem pendente na fila")
+    order = db.orders_by_id[next_ids[0]]
+    
+    with db.order_update(order, user):
+        order.status = OrderStatus.EM_ANDAMENTO
+        order.updated_at = datetime.now()
+    db.record_activity(order, user.name)
+    db.add_notifications(build_notifications(
+        [order.requester_id],
+        title="Atualização de OS",
+        message=f"Sua ordem '{order.title}' foi atualizada para: {order.status.value}",
+        order_id=order.id
+    ))
+    db._save_data()
+    
+    return order
+
 # ==================== ENDPOINTS DE COMENTÁRIOS ====================
 
 @app.get("/api/orders/{order_id}/comments", response_model=List[Comment])
 async def list_comments(order_id: str, user: User = Depends(get_current_user)):
     """Lista comentários de uma ordem"""
-    order = next((o for o in db.orders if o.id == order_id), None)
-    if not order:
+    order = db.orders_by_id.get(order_id)
+    if order:
+        comments = db.comments_by_order.get(order_id, [])
+    elif order_id in db.archive:
+        comments = [Comment(**c) for c in db.archive.get(order_id)["comments"]]
+    else:
         raise HTTPException(status_code=404, detail="Ordem não encontrada")
     
-    comments = [c for c in db.comments if c.order_id == order_id]
-    
     # Moradores não veem comentários internos
     if user.role == UserRole.MORADOR:
         comments = [c for c in comments if not c.is_internal]
@@ -571,7 +2938,7 @@ async def create_comment(
     user: User = Depends(get_current_user)
 ):
     """Adiciona comentário a uma ordem"""
-    order = next((o for o in db.orders if o.id == order_id), None)
+    order = db.orders_by_id.get(order_id)
     if not order:
         raise HTTPException(status_code=404, detail="Ordem não encontrada")
     
@@ -584,7 +2951,7 @@ async def create_comment(
         raise HTTPException(status_code=403, detail="Acesso negado")
     
     new_comment = Comment(
-        id=str(uuid.uuid4()),
+        id=new_id(),
         order_id=order_id,
         user_id=user.id,
         user_name=user.name,
@@ -593,13 +2960,13 @@ async def create_comment(
         created_at=datetime.now(),
         is_internal=comment_data.is_internal
     )
-    db.comments.append(new_comment)
+    db.add_comment(new_comment)
     db._save_data()
     
     # Notificar solicitante sobre novo comentário
     if order.requester_id != user.id:
         notification = Notification(
-            id=str(uuid.uuid4()),
+            id=new_id(),
             user_id=order.requester_id,
             title="Novo Comentário",
             message=f"{user.name} comentou na ordem '{order.title}'",
@@ -607,7 +2974,7 @@ async def create_comment(
             read=False,
             created_at=datetime.now()
         )
-        db.notifications.append(notification)
+        db.add_notifications([notification])
         db._save_data()
     
     return new_comment
@@ -636,16 +3003,14 @@ async def mark_notification_read(
     if not notification or notification.user_id != user.id:
         raise HTTPException(status_code=404, detail="Notificação não encontrada")
     
-    notification.read = True
+    db.mark_notifications_read([notification])
     db._save_data()
     return {"success": True}
 
 @app.put("/api/notifications/read-all")
 async def mark_all_notifications_read(user: User = Depends(get_current_user)):
     """Marca todas as notificações como lidas"""
-    for n in db.notifications:
-        if n.user_id == user.id:
-            n.read = True
+    db.mark_notifications_read([n for n in db.notifications if n.user_id == user.id and not n.read])
     db._save_data()
     return {"success": True}
 
@@ -654,65 +3019,291 @@ async def mark_all_notifications_read(user: User = Depends(get_current_user)):
 @app.get("/api/reports/stats", response_model=Stats)
 async def get_stats(user: User = Depends(require_role([UserRole.ADMIN, UserRole.SINDICO]))):
     """Retorna estatísticas do sistema"""
-    orders = db.orders
-    
-    # Contagens por status
-    pending = len([o for o in orders if o.status == OrderStatus.PENDENTE])
-    in_progress = len([o for o in orders if o.status == OrderStatus.EM_ANDAMENTO])
-    completed = len([o for o in orders if o.status == OrderStatus.CONCLUIDA])
-    cancelled = len([o for o in orders if o.status == OrderStatus.CANCELADA])
-    
-    # Tempo médio de resolução
-    completed_orders = [o for o in orders if o.status == OrderStatus.CONCLUIDA and o.completed_at]
-    if completed_orders:
-        total_hours = sum(
-            (o.completed_at - o.created_at).total_seconds() / 3600 
-            for o in completed_orders
-        )
-        avg_hours = total_hours / len(completed_orders)
-    else:
-        avg_hours = 0
+    # Calculado numa thread sobre um snapshot, sem segurar o event loop
+    with db.snapshot() as snapshot:
+        return await asyncio.to_thread(_compute_stats, snapshot)
+
+def _compute_stats(snapshot: Snapshot) -> Stats:
+    statuses = {s: 0 for s in OrderStatus}
+    categories = {cat.value: 0 for cat in Category}
+    priorities = {pri.value: 0 for pri in Priority}
+    resolution_seconds = 0.0
+    resolved = 0
     
-    # Por categoria
-    categories = {}
-    for cat in Category:
-        categories[cat.value] = len([o for o in orders if o.category == cat])
+    for order_status, category, priority, created_at, completed_at in snapshot.rows(
+        "status", "category", "priority", "created_at", "completed_at"
+    ):
+        statuses[order_status] += 1
+        categories[category.value] += 1
+        priorities[priority.value] += 1
+        # Tempo médio de resolução
+        if order_status == OrderStatus.CONCLUIDA and completed_at:
+            resolution_seconds += (completed_at - created_at).total_seconds()
+            resolved += 1
     
-    # Por prioridade
-    priorities = {}
-    for pri in Priority:
-        priorities[pri.value] = len([o for o in orders if o.priority == pri])
+    avg_hours = resolution_seconds / 3600 / resolved if resolved else 0
     
     return Stats(
-        total_orders=len(orders),
-        pending_orders=pending,
-        in_progress_orders=in_progress,
-        completed_orders=completed,
-        cancelled_orders=cancelled,
+        total_orders=len(snapshot),
+        pending_orders=statuses[OrderStatus.PENDENTE],
+        in_progress_orders=statuses[OrderStatus.EM_ANDAMENTO],
+        completed_orders=statuses[OrderStatus.CONCLUIDA],
+        cancelled_orders=statuses[OrderStatus.CANCELADA],
         avg_resolution_time_hours=round(avg_hours, 2),
         orders_by_category=categories,
         orders_by_priority=priorities
     )
 
+@app.get("/api/reports/time-in-status", response_model=List[StatusDuration])
+async def time_in_status(user: User = Depends(require_role([UserRole.ADMIN, UserRole.SINDICO]))):
+    """Tempo que as ordens passaram em cada status em aberto (média e percentis, em horas)"""
+    # Agregado mantido incrementalmente pelo histórico, sem varrer ordens ou eventos
+    return db.history.durations()
+
 @app.get("/api/reports/orders-by-period")
 async def orders_by_period(
     start_date: datetime,
     end_date: datetime,
+    completed: bool = False,
     user: User = Depends(require_role([UserRole.ADMIN, UserRole.SINDICO]))
 ):
-    """Retorna ordens criadas em um período"""
-    orders = [
-        o for o in db.orders 
-        if start_date <= o.created_at <= end_date
-    ]
-    return {"count": len(orders), "orders": orders}
+    """Retorna ordens criadas (ou concluídas, com completed=true) em um período"""
+    index = db.orders_by_completed if completed else db.orders_by_created
+    start_date, end_date = _local_naive(start_date), _local_naive(end_date)
+    # A codificação (a parte cara para períodos longos) roda numa thread sobre um snapshot
+    with db.snapshot(index.range(start_date, end_date)) as snapshot:
+        fragments = await asyncio.to_thread(lambda: list(snapshot.read(Order.model_dump_json)))
+    body = f'{{"count":{len(fragments)},"orders":[' + ",".join(fragments) + "]}"
+    return Response(body.encode(), media_type="application/json")
+
+@app.get("/api/reports/timeseries", response_model=Timeseries)
+async def orders_timeseries(
+    start_date: datetime,
+    end_date: datetime,
+    granularity: TimeseriesGranularity = TimeseriesGranularity.DIA,
+    category: Optional[Category] = None,
+    priority: Optional[Priority] = None,
+    user: User = Depends(require_role([UserRole.ADMIN, UserRole.SINDICO]))
+):
+    """Série temporal de ordens criadas, concluídas e canceladas por dia ou semana"""
+    start_date, end_date = _local_naive(start_date), _local_naive(end_date)
+    if end_date < start_date:
+        raise HTTPException(status_code=400, detail="Período inválido")
+    if category and priority:
+        raise HTTPException(status_code=400, detail="Filtre por categoria ou por prioridade, não ambos")
+    step_days = 7 if granularity == TimeseriesGranularity.SEMANA else 1
+    if (end_date - start_date).days // step_days > MAX_TIMESERIES_BUCKETS:
+        raise HTTPException(status_code=400, detail="Período muito longo para a granularidade")
+    
+    return Timeseries(
+        granularity=granularity,
+        category=category,
+        priority=priority,
+        buckets=db.rollups.series(granularity, start_date, end_date, category, priority)
+    )
+
+# ==================== ENDPOINTS DE MANUTENÇÃO ====================
+
+@app.post("/api/admin/archive", response_model=dict)
+async def archive_closed_orders(
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Arquiva ordens concluídas/canceladas há mais de N dias"""
+    if older_than_days < 0:
+        raise HTTPException(status_code=400, detail="older_than_days inválido")
+    return db.archive_closed_orders(older_than_days)
+
+@app.post("/api/admin/notifications/compact", response_model=dict)
+async def compact_notifications(
+    read_ttl_days: int = NOTIFICATION_READ_TTL_DAYS,
+    max_per_user: int = NOTIFICATION_MAX_PER_USER,
+    user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Aplica a retenção de notificações imediatamente"""
+    if read_ttl_days < 0 or max_per_user < 1:
+        raise HTTPException(status_code=400, detail="Parâmetros de retenção inválidos")
+    return db.compact_notifications(read_ttl_days, max_per_user)
+
+metrics.describe("condoos_backup_duration_seconds", "histogram", "Duração da geração de backups", LATENCY_BUCKETS)
+
+@app.post("/api/admin/backup")
+async def create_backup(
+    background_tasks: BackgroundTasks,
+    user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Backup a quente (tar.gz) da base, do journal e das fotos referenciadas"""
+    import tempfile
+    backup = db.backup
+    fd, path = tempfile.mkstemp(prefix="condoos-backup-", suffix=".tar.gz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            meta = await asyncio.to_thread(backup, f)
+    except Exception:
+        os.remove(path)
+        raise
+    background_tasks.add_task(os.remove, path)
+    return FileResponse(
+        path,
+        media_type="application/gzip",
+        filename=f"condoos-backup-{meta['seq']}.tar.gz",
+        headers={"X-CondoOS-Journal-Seq": str(meta["seq"])}
+    )
+
+async def _notification_compaction_loop():
+    """Compacta as notificações periodicamente conforme a retenção configurada"""
+    if NOTIFICATION_COMPACTION_INTERVAL <= 0:
+        return
+    while True:
+        await asyncio.sleep(NOTIFICATION_COMPACTION_INTERVAL)
+        for condo_id, partition in tenants.loaded():
+            try:
+                report = partition.compact_notifications(NOTIFICATION_READ_TTL_DAYS, NOTIFICATION_MAX_PER_USER)
+                if report["evicted"]:
+                    print(
+                        f"Notificações compactadas ({condo_id or 'padrão'}): {report['evicted']} removidas, "
+                        f"{report['bytes_reclaimed']} bytes liberados"
+                    )
+            except Exception as e:
+                print(f"Erro ao compactar notificações ({condo_id or 'padrão'}): {e}")
+
+metrics.describe("condoos_sla_breaches_total", "counter", "Ordens que passaram do prazo estimado, por categoria")
+metrics.describe("condoos_sla_scheduled_orders", "gauge", "Ordens abertas com prazo de SLA vigiado")
+
+@metrics.collector
+def _collect_sla_scheduled():
+    metrics.set("condoos_sla_scheduled_orders", len(db.sla))
+
+def _notify_sla_breach(order: Order):
+    recipients = [u.id for u in db.users_with_roles([UserRole.SINDICO, UserRole.ADMIN])]
+    if order.assigned_to and order.assigned_to not in recipients:
+        recipients.append(order.assigned_to)
+    db.add_notifications(build_notifications(
+        recipients,
+        title="Prazo de OS estourado",
+        message=f"A ordem '{order.title}' passou do prazo estimado e foi escalada para: {order.priority.value}",
+        order_id=order.id
+    ))
+
+async def _sla_escalation_loop(loaded: asyncio.Task):
+    """Dorme até o próximo prazo de SLA (ou até surgir um prazo anterior) e escala as vencidas"""
+    await asyncio.shield(loaded)
+    while True:
+        sla_wakeup.event.clear()
+        deadlines = [d for _, p in tenants.loaded() if (d := p.sla.next_deadline()) is not None]
+        timeout = max(min(deadlines) - time.time(), 0) if deadlines else None
+        try:
+            await asyncio.wait_for(sla_wakeup.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        for condo_id, _ in tenants.loaded():
+            try:
+                with condo_context(condo_id):
+                    breached = db.escalate_overdue()
+                    for order in breached:
+                        metrics.inc("condoos_sla_breaches_total", category=order.category.value)
+                        _notify_sla_breach(order)
+                    if breached:
+                        db._save_data()
+            except Exception as e:
+                print(f"Erro ao escalar ordens vencidas ({condo_id or 'padrão'}): {e}")
+
+# ==================== ENDPOINTS DE MONITORAMENTO ====================
+
+@metrics.collector
+def _collect_collection_sizes():
+    metrics.set("condoos_collection_items", len(db.users), collection="users")
+    metrics.set("condoos_collection_items", len(db.orders), collection="orders")
+    metrics.set("condoos_collection_items", len(db.comments), collection="comments")
+    metrics.set("condoos_collection_items", len(db.notifications), collection="notifications")
+    metrics.set("condoos_collection_items", len(db.archive), collection="archived_orders")
+    metrics.set("condoos_collection_items", db.history.count, collection="order_events")
+
+metrics.describe("condoos_order_json_cache_hits_total", "counter", "Ordens servidas do cache de JSON da listagem")
+metrics.describe("condoos_order_json_cache_misses_total", "counter", "Ordens codificadas por falta no cache de JSON")
+metrics.describe("condoos_order_json_cache_entries", "gauge", "Fragmentos JSON de ordens em cache")
+
+@metrics.collector
+def _collect_order_json_cache():
+    metrics.set("condoos_order_json_cache_hits_total", db.order_json.hits)
+    metrics.set("condoos_order_json_cache_misses_total", db.order_json.misses)
+    metrics.set("condoos_order_json_cache_entries", len(db.order_json))
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Métricas no formato texto do Prometheus"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/api/admin/profiles", response_model=List[dict])
+async def list_profiles(user: User = Depends(require_role([UserRole.ADMIN]))):
+    """Lista os perfis de requisição guardados, do mais recente ao mais antigo"""
+    profiles = []
+    for path in sorted(PROFILE_DIR.glob("*.json"), reverse=True):
+        with open(path, "r") as f:
+            profiles.append(json.load(f))
+    return profiles
+
+@app.get("/api/admin/profiles/{profile_id}/{kind}")
+async def download_profile(
+    profile_id: str,
+    kind: str,
+    user: User = Depends(require_role([UserRole.ADMIN]))
+):
+    """Baixa um perfil como pstats (cProfile) ou pilhas colapsadas (flamegraph)"""
+    if kind not in ("pstats", "collapsed"):
+        raise HTTPException(status_code=400, detail="Formato inválido")
+    path = PROFILE_DIR / f"{Path(profile_id).name}.{kind}"
+    if not path.exists():
+        raise HTTPException(status_code=404, detail="Perfil não encontrado")
+    return FileResponse(path, filename=path.name)
+
+@app.get("/api/admin/loop-stalls", response_model=dict)
+async def list_loop_stalls(user: User = Depends(require_role([UserRole.ADMIN]))):
+    """Bloqueios do event loop agregados por ponto de chamada"""
+    return loop_watchdog.sites
 
 # ==================== HEALTH CHECK ====================
 
 @app.get("/api/health")
 async def health_check():
-    """Verifica saúde da API"""
-    return {"status": "ok", "timestamp": datetime.now()}
+    """Verifica saúde da API (503 enquanto a base não terminou de carregar)"""
+    if not db.ready:
+        return JSONResponse(
+            {"status": "starting", "timestamp": datetime.now().isoformat(), "startup": startup_phases},
+            status_code=503
+        )
+    return {"status": "ok", "timestamp": datetime.now(), "startup": startup_phases}
+
+# ==================== OPENAPI ====================
+
+def route_signatures() -> set:
+    """(path, método) de todas as rotas documentadas da aplicação"""
+    return {
+        (route.path, method.lower())
+        for route in app.routes
+        if isinstance(route, APIRoute) and route.include_in_schema
+        for method in route.methods
+    }
+
+def schema_signatures(schema: dict) -> set:
+    return {(path, method) for path, operations in schema["paths"].items() for method in operations}
+
+def openapi_from_artifact() -> dict:
+    """Serve o schema do artefato pré-gerado em vez de percorrer rotas e modelos"""
+    if app.openapi_schema is None:
+        with open(OPENAPI_ARTIFACT, "r") as f:
+            schema = json.load(f)
+        # Conferência barata: só compara as rotas, sem gerar o schema
+        if schema_signatures(schema) != route_signatures():
+            print(f"Artefato OpenAPI {OPENAPI_ARTIFACT} não confere com as rotas; gerando o schema")
+            return FastAPI.openapi(app)
+        app.openapi_schema = schema
+    return app.openapi_schema
+
+if OPENAPI_ARTIFACT:
+    app.openapi = openapi_from_artifact
+
+startup_phases["app"] = round((time.perf_counter() - _import_started) * 1000 - startup_phases["imports"], 1)
 
 # ==================== INICIALIZAÇÃO ====================
 
@@ -0,0 +1,12 @@
+"""Configuração dos testes: main.py é importado com dados e uploads num diretório temporário"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+_root = Path(tempfile.mkdtemp(prefix="condoos-tests-"))
+os.environ["CONDOOS_DATA_DIR"] = str(_root / "data")
+os.environ["CONDOOS_UPLOAD_DIR"] = str(_root / "uploads")
+os.environ["CONDOOS_RATE_LIMIT"] = "0"
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
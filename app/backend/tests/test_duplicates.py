@@ -0,0 +1,83 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+ADMIN = {"Authorization": "Bearer token_1"}
+RESIDENT = {"Authorization": "Bearer token_3"}
+ELEVATOR = {
+    "title": "Elevador parado",
+    "description": "O elevador do bloco B está parado no 3º andar",
+    "category": "outros",
+    "priority": "alta",
+}
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        while not main.tenants.default.ready:
+            time.sleep(0.01)
+        yield client
+
+@pytest.fixture(scope="module")
+def neighbour(client):
+    user = client.post("/api/users", headers=ADMIN, json={
+        "name": "Vizinho", "email": "vizinho@condo.com", "password": "viz123", "role": "morador", "apartment": "202B",
+    }).json()
+    return {"Authorization": f"Bearer token_{user['id']}"}
+
+def test_residents_only_see_their_own_candidates(client, neighbour):
+    first = client.post("/api/orders", headers=RESIDENT, json=ELEVATOR).json()
+
+    created = client.post("/api/orders", headers=neighbour, json=ELEVATOR).json()
+    assert created["duplicate_candidates"] == []
+    assert client.get(f"/api/orders/{first['id']}", headers=neighbour).status_code == 403
+
+    again = client.post("/api/orders", headers=RESIDENT, json=ELEVATOR).json()
+    assert first["id"] in [c["order_id"] for c in again["duplicate_candidates"]]
+    assert created["id"] not in [c["order_id"] for c in again["duplicate_candidates"]]
+
+    staff = client.post("/api/orders", headers=ADMIN, json=ELEVATOR).json()
+    assert {first["id"], created["id"]} <= {c["order_id"] for c in staff["duplicate_candidates"]}
+
+def _order(title, description, category=main.Category.OUTROS, status=main.OrderStatus.PENDENTE) -> main.Order:
+    now = main.datetime.now()
+    return main.Order(
+        id=main.new_id(), title=title, description=description, category=category,
+        priority=main.Priority.MEDIA, status=status, requester_id="3", requester_name="Maria Moradora",
+        created_at=now, updated_at=now,
+    )
+
+def test_lsh_finds_near_duplicates_in_the_same_category():
+    index = main.DuplicateIndex()
+    original = _order("Elevador parado", "O elevador do bloco B está parado no 3º andar")
+    unrelated = _order("Barulho após as 22h", "Som alto no apartamento 504 todas as noites")
+    for order in (original, unrelated):
+        index.add(order)
+
+    report = _order("elevador PARADO", "o elevador do bloco B esta parado no 3o andar desde cedo")
+    matches = dict(index.candidates(report))
+    assert original.id in matches
+    assert matches[original.id] >= main.DUPLICATE_SIMILARITY
+    assert unrelated.id not in matches
+
+def test_lsh_ignores_other_categories():
+    index = main.DuplicateIndex()
+    original = _order("Elevador parado", "O elevador do bloco B está parado no 3º andar")
+    index.add(original)
+    same_text = _order(original.title, original.description, category=main.Category.ELETRICA)
+    assert index.candidates(same_text) == []
+
+def test_lsh_drops_closed_and_merged_orders():
+    index = main.DuplicateIndex()
+    original = _order("Elevador parado", "O elevador do bloco B está parado no 3º andar")
+    index.rebuild([original, _order("Elevador parado", "Outro", status=main.OrderStatus.CONCLUIDA)])
+    assert len(index) == 1
+
+    before = original.model_copy()
+    original.duplicate_of = "outra"
+    index.update(original, before)
+    assert len(index) == 0
+    assert index.candidates(_order(original.title, original.description)) == []
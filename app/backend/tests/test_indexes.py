@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+import main
+
+def _order(**fields) -> main.Order:
+    now = datetime.now()
+    values = dict(
+        id=main.new_id(), title="Portão travando", description="Garagem", category=main.Category.SEGURANCA,
+        priority=main.Priority.MEDIA, status=main.OrderStatus.PENDENTE, requester_id="3",
+        requester_name="Maria Moradora", created_at=now, updated_at=now,
+    )
+    values.update(fields)
+    return main.Order(**values)
+
+def _database(tmp_path) -> main.Database:
+    db = main.Database(tmp_path)
+    db.load()
+    return db
+
+def test_notification_compaction_keeps_sla_heap(tmp_path):
+    db = _database(tmp_path)
+    db.add_order(_order(estimated_completion=datetime.now() + timedelta(days=1), assigned_to="4"))
+    db.add_notifications(main.build_notifications(["1"], "Teste", "Lida há tempo"))
+    db.notifications[-1].read = True
+    db.notifications[-1].created_at = datetime.now() - timedelta(days=365)
+    heap, queues = db.sla._heap, db.work_queues._queues
+
+    report = db.compact_notifications(read_ttl_days=30, max_per_user=200)
+    assert report["expired"] == 1
+    assert db.sla._heap is heap
+    assert len(db.sla) == 1
+    assert db.work_queues._queues is queues
+
+def test_archiving_keeps_last_activity_of_remaining_orders(tmp_path):
+    db = _database(tmp_path)
+    old_closed = _order(
+        status=main.OrderStatus.CONCLUIDA,
+        created_at=datetime.now() - timedelta(days=400),
+        completed_at=datetime.now() - timedelta(days=365),
+    )
+    db.add_order(old_closed)
+    order = _order()
+    db.add_order(order)
+    with db.order_update(order):
+        order.priority = main.Priority.ALTA
+        order.updated_at = datetime.now()
+    db.record_activity(order, "Síndico João")
+    db.add_comment(main.Comment(
+        id=main.new_id(), order_id=order.id, user_id="3", user_name="Maria Moradora",
+        user_role=main.UserRole.MORADOR, content="Obrigada", created_at=datetime.now() - timedelta(days=1),
+    ))
+
+    assert db.archive_closed_orders(older_than_days=90)["orders"] == 1
+    activity = db.order_activity[order.id]
+    assert activity["by"] == "Síndico João"
+    assert activity["at"] == order.updated_at
+    assert activity["public_comments"] == 1
+    assert old_closed.id not in db.order_activity
+
+def test_snapshot_reads_pre_images_of_orders_changed_during_the_read(tmp_path):
+    db = _database(tmp_path)
+    orders = [_order(title=f"Ordem {i}") for i in range(3)]
+    for order in orders:
+        db.add_order(order)
+
+    def status_then_close_next(order):
+        status = order.status
+        # Outro handler altera a ordem lida e a próxima no meio da leitura
+        # (a releitura da versão anterior é uma cópia, fora da lista)
+        position = next((i for i, o in enumerate(orders) if o is order), None)
+        if position is None:
+            return status
+        for target in orders[position:position + 2]:
+            if target.status != main.OrderStatus.CONCLUIDA:
+                with db.order_update(target):
+                    target.status = main.OrderStatus.CONCLUIDA
+                    target.completed_at = datetime.now()
+        return status
+
+    with db.snapshot() as snapshot:
+        assert len(snapshot) == 3
+        statuses = list(snapshot.read(status_then_close_next))
+        assert statuses == [main.OrderStatus.PENDENTE] * 3
+        assert list(snapshot.rows("status")) == [main.OrderStatus.PENDENTE] * 3
+    assert [o.status for o in orders] == [main.OrderStatus.CONCLUIDA] * 3
+    assert not db.snapshots
+
+def test_rollups_move_buckets_on_status_changes(tmp_path):
+    db = _database(tmp_path)
+    created_at = datetime.now() - timedelta(days=10)
+    order = _order(created_at=created_at, updated_at=created_at)
+    db.add_order(order)
+    days = db.rollups.buckets[main.TimeseriesGranularity.DIA.value]
+    opened = days[created_at.date().isoformat()]
+    today = datetime.now().date().isoformat()
+
+    with db.order_update(order):
+        order.status = main.OrderStatus.CONCLUIDA
+        order.completed_at = datetime.now()
+    closed = days[today]
+    assert closed["total"]["completed"] == 1
+    assert closed["category"]["seguranca"]["completed"] == 1
+    assert closed["priority"]["media"]["completed"] == 1
+    assert closed["total"]["resolution_seconds"] == pytest.approx(10 * 86400, rel=1e-3)
+
+    # Reaberta com outra prioridade: a conclusão sai e a criação troca de quebra
+    with db.order_update(order):
+        order.status = main.OrderStatus.PENDENTE
+        order.completed_at = None
+        order.priority = main.Priority.ALTA
+    assert closed["total"]["completed"] == 0
+    assert closed["total"]["resolution_seconds"] == pytest.approx(0, abs=1e-6)
+    assert opened["total"]["created"] == 1
+    assert opened["priority"]["media"]["created"] == 0
+    assert opened["priority"]["alta"]["created"] == 1
+
+    with db.order_update(order):
+        order.status = main.OrderStatus.CANCELADA
+        order.cancelled_at = datetime.now()
+    assert closed["total"]["cancelled"] == 1
+    assert closed["priority"]["alta"]["cancelled"] == 1
+    assert closed["total"]["completed"] == 0
@@ -0,0 +1,172 @@
+import json
+from datetime import datetime
+
+from click.testing import CliRunner
+
+import main
+from condoos_admin import cli
+
+def _order(title: str) -> main.Order:
+    now = datetime.now()
+    return main.Order(
+        id=main.new_id(),
+        title=title,
+        description="Descrição",
+        category=main.Category.ELETRICA,
+        priority=main.Priority.MEDIA,
+        status=main.OrderStatus.PENDENTE,
+        requester_id="3",
+        requester_name="Maria Moradora",
+        created_at=now,
+        updated_at=now,
+    )
+
+def _database(path) -> main.Database:
+    path.mkdir(parents=True, exist_ok=True)
+    db = main.Database(path)
+    db.load()
+    return db
+
+def test_journal_load_with_large_last_entry(tmp_path):
+    journal = main.Journal(tmp_path / "journal.jsonl")
+    journal.append("put", "notification", items=[{"id": "1"}])
+    journal.append("put", "notification", items=[{"id": str(i), "message": "x" * 400} for i in range(3000)])
+    assert (tmp_path / "journal.jsonl").stat().st_size > 1_000_000
+
+    reloaded = main.Journal(tmp_path / "journal.jsonl")
+    reloaded.load()
+    assert reloaded.seq == 2
+
+def test_journal_load_discards_partial_last_entry(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    journal = main.Journal(path)
+    journal.append("put", "order", items=[{"id": "1"}])
+    journal.append("put", "order", items=[{"id": "2"}])
+    complete_size = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'{"seq": 3, "at": "2026-01-01 00:00:00", "op": "put", "ki')
+
+    reloaded = main.Journal(path)
+    reloaded.load()
+    assert reloaded.seq == 2
+    assert path.stat().st_size == complete_size
+    assert reloaded.append("put", "order", items=[{"id": "3"}]) == 3
+    with open(path) as f:
+        assert [json.loads(line)["seq"] for line in f] == [1, 2, 3]
+
+def test_journal_load_with_only_partial_entry(tmp_path):
+    path = tmp_path / "journal.jsonl"
+    path.write_bytes(b'{"seq": 1, "at"')
+    journal = main.Journal(path)
+    journal.load()
+    assert journal.seq == 0
+    assert path.stat().st_size == 0
+
+def test_database_loads_after_torn_journal(tmp_path):
+    db = _database(tmp_path / "data")
+    db.add_order(_order("Lâmpada queimada"))
+    db._save_data()
+    with open(tmp_path / "data" / "journal.jsonl", "ab") as f:
+        f.write(b'{"seq": 99, "op": "put", "items": [{"id"')
+
+    reloaded = _database(tmp_path / "data")
+    assert reloaded.ready
+    assert reloaded.journal.seq == db.journal.seq
+
+def test_restore_to_seq(tmp_path):
+    data_dir = tmp_path / "data"
+    db = _database(data_dir)
+    order = _order("Vazamento na garagem")
+    db.add_order(order)
+    db._save_data()
+    backup_path = tmp_path / "backup.tar.gz"
+    with open(backup_path, "wb") as f:
+        meta = db.backup(f)
+
+    with db.order_update(order):
+        order.status = main.OrderStatus.EM_ANDAMENTO
+    in_progress_seq = db.journal.seq
+    with db.order_update(order):
+        order.status = main.OrderStatus.CONCLUIDA
+        order.completed_at = datetime.now()
+    second = _order("Portão travando")
+    db.add_order(second)
+
+    target = tmp_path / "restored"
+    result = CliRunner().invoke(cli, [
+        "--data-dir", str(data_dir), "restore", str(backup_path), "--target", str(target),
+        "--to-seq", str(in_progress_seq), "--journal", str(data_dir / "journal.jsonl"),
+    ])
+    assert result.exit_code == 0, result.output
+    assert f"base na sequência {in_progress_seq}" in result.output
+
+    with open(target / "orders.json") as f:
+        orders = {o["id"]: o for o in json.load(f)}
+    assert orders[order.id]["status"] == "em_andamento"
+    assert second.id not in orders
+    with open(target / "journal.jsonl") as f:
+        assert json.loads(f.readlines()[-1])["seq"] == in_progress_seq
+    assert meta["seq"] < in_progress_seq
+
+    restored = _database(target)
+    assert restored.journal.seq == in_progress_seq
+    assert restored.orders_by_id[order.id].status == main.OrderStatus.EM_ANDAMENTO
+
+def test_read_only_load_writes_nothing(tmp_path):
+    empty = tmp_path / "empty"
+    empty.mkdir()
+    db = main.Database(empty)
+    db.load(read_only=True)
+    assert db.ready and not db.users
+    assert list(empty.iterdir()) == []
+
+    data_dir = tmp_path / "data"
+    db = _database(data_dir)
+    db.add_order(_order("Lâmpada queimada"))
+    db._save_data()
+    for name in ("journal.jsonl", "events.jsonl"):
+        with open(data_dir / name, "ab") as f:
+            f.write(b'{"seq": 99, "op": "put"')
+    before = {p.name: p.read_bytes() for p in data_dir.iterdir() if p.is_file()}
+
+    reloaded = main.Database(data_dir)
+    reloaded.load(read_only=True)
+    assert reloaded.journal.seq == db.journal.seq
+    assert len(reloaded.orders) == 1
+    assert {p.name: p.read_bytes() for p in data_dir.iterdir() if p.is_file()} == before
+
+def test_compact_cuts_journal_to_saved_seq(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    db = _database(data_dir)
+    order = _order("Vazamento na garagem")
+    db.add_order(order)
+    db._save_data()
+    backup_path = tmp_path / "backup.tar.gz"
+    with open(backup_path, "wb") as f:
+        db.backup(f)
+    db.add_order(_order("Portão travando"))
+    with db.order_update(order):
+        order.status = main.OrderStatus.EM_ANDAMENTO
+    db._save_data()
+    seq = db.journal.seq
+
+    monkeypatch.setenv("CONDOOS_DATA_DIR", str(data_dir))
+    result = CliRunner().invoke(cli, ["--data-dir", str(data_dir), "compact", "--no-notifications"])
+    assert result.exit_code == 0, result.output
+    with open(data_dir / "journal.jsonl") as f:
+        assert [json.loads(line)["seq"] for line in f] == [seq]
+
+    reloaded = _database(data_dir)
+    assert reloaded.journal.seq == seq
+    assert reloaded.orders_by_id[order.id].status == main.OrderStatus.EM_ANDAMENTO
+    with reloaded.order_update(reloaded.orders_by_id[order.id]):
+        reloaded.orders_by_id[order.id].status = main.OrderStatus.CONCLUIDA
+    assert reloaded.journal.seq == seq + 1
+
+    # O backup anterior à compactação não avança por cima do buraco
+    result = CliRunner().invoke(cli, [
+        "--data-dir", str(data_dir), "restore", str(backup_path), "--target", str(tmp_path / "restored"),
+        "--journal", str(data_dir / "journal.jsonl"),
+    ])
+    assert result.exit_code != 0
+    assert "salta da sequência" in result.output
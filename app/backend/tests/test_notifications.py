@@ -0,0 +1,31 @@
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+import main
+
+def test_new_order_fan_out_runs_on_the_event_loop(monkeypatch):
+    calls = []
+    original = main.Database.add_notifications
+
+    def add_notifications(self, notifications):
+        try:
+            asyncio.get_running_loop()
+            calls.append("loop")
+        except RuntimeError:
+            calls.append("thread")
+        return original(self, notifications)
+
+    monkeypatch.setattr(main.Database, "add_notifications", add_notifications)
+    with TestClient(main.app) as client:
+        while not main.tenants.default.ready:
+            time.sleep(0.01)
+        order = client.post("/api/orders", headers={"Authorization": "Bearer token_3"}, json={
+            "title": "Lixo acumulado", "description": "Escada do bloco A", "category": "limpeza", "priority": "baixa",
+        }).json()
+        staff_ids = {u.id for u in main.db.users_with_roles([main.UserRole.SINDICO, main.UserRole.ADMIN])}
+        notified = {n.user_id for n in main.db.notifications_by_order.get(order["id"], [])}
+
+    assert calls == ["loop"]
+    assert notified == staff_ids
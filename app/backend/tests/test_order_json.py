@@ -0,0 +1,40 @@
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+ADMIN = {"Authorization": "Bearer token_1"}
+
+@pytest.fixture
+def client():
+    with TestClient(main.app) as client:
+        yield client
+
+def _bodies(client, monkeypatch, **params):
+    cached = client.get("/api/orders", headers=ADMIN, params=params).content
+    with monkeypatch.context() as m:
+        m.setattr(main, "ORDER_JSON_CACHE_SIZE", 0)
+        plain = client.get("/api/orders", headers=ADMIN, params=params).content
+    return cached, plain
+
+def test_cached_list_matches_response_model(client, monkeypatch):
+    created = [
+        client.post("/api/orders", headers=ADMIN, json={
+            "title": "Elevador parado no 3º andar", "description": "Porta não fecha — \"urgente\"",
+            "category": "eletrica", "priority": "alta",
+            "estimated_completion": (datetime.now() + timedelta(days=2)).isoformat(),
+        }).json(),
+        client.post("/api/orders", headers=ADMIN, json={
+            "title": "Poda", "description": "Árvore da entrada", "category": "jardinagem", "priority": "baixa",
+        }).json(),
+    ]
+    cached, plain = _bodies(client, monkeypatch)
+    assert cached == plain
+
+    # Depois de uma alteração o cache da ordem é refeito
+    client.put(f"/api/orders/{created[0]['id']}", headers=ADMIN, json={"status": "concluida", "assigned_to": "4"})
+    cached, plain = _bodies(client, monkeypatch, status="concluida")
+    assert cached == plain
+    assert created[0]["id"].encode() in cached
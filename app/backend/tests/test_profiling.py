@@ -0,0 +1,13 @@
+from fastapi.testclient import TestClient
+
+import main
+
+def _scope(authorization: bytes):
+    return {"type": "http", "headers": [(b"authorization", authorization)]}
+
+def test_admin_request_accepts_any_scheme_case():
+    with TestClient(main.app):
+        assert main._is_admin_request(_scope(b"Bearer token_1"))
+        assert main._is_admin_request(_scope(b"bearer token_1"))
+        assert not main._is_admin_request(_scope(b"bearer token_2"))
+        assert not main._is_admin_request(_scope(b"Basic token_1"))
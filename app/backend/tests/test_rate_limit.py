@@ -0,0 +1,59 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+@pytest.fixture
+def identity():
+    with TestClient(main.app):
+        while not main.tenants.default.ready:
+            time.sleep(0.01)
+        policy = next(p for _, _, p in main.RATE_LIMIT_POLICIES if p.name == "default")
+
+        def identity(authorization=None):
+            headers = [(b"authorization", authorization.encode())] if authorization else []
+            return main._request_identity({"headers": headers, "client": ("10.0.0.1", 1234)}, policy)
+        yield identity
+
+def test_scheme_case_does_not_split_quota(identity):
+    keys = {identity(f"{scheme} token_1") for scheme in ("Bearer", "bearer", "BEARER", "bEaReR")}
+    assert keys == {"user::1"}
+
+def test_unknown_tokens_fall_back_to_ip(identity):
+    assert identity("Bearer token_nobody") == "10.0.0.1"
+    assert identity("Bearer token_condo-x:1") == "10.0.0.1"
+    assert identity("Basic abc") == "10.0.0.1"
+    assert identity() == "10.0.0.1"
+
+def test_garbage_tokens_share_one_bucket():
+    limiter = main.RateLimiter()
+    policy = main.RateLimitPolicy("teste", capacity=3, per_second=0.001, key="user")
+    scope = lambda token: {"headers": [(b"authorization", f"Bearer {token}".encode())], "client": ("10.0.0.2", 1)}
+    results = [limiter.acquire(policy, main._request_identity(scope(f"lixo{i}"), policy)) for i in range(5)]
+    assert results[:3] == [0.0, 0.0, 0.0]
+    assert all(r > 0 for r in results[3:])
+    assert len(limiter.buckets) == 1
+
+def test_rejections_carry_cors_headers_and_are_counted(monkeypatch):
+    monkeypatch.setattr(main, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setattr(main, "rate_limiter", main.RateLimiter())
+    origin = {"Origin": "https://app.condoos.example"}
+    with TestClient(main.app) as client:
+        while not main.tenants.default.ready:
+            time.sleep(0.01)
+        statuses = [
+            client.post("/api/auth/login", json={"email": "x@y.com", "password": "errada"}, headers=origin)
+            for _ in range(6)
+        ]
+        assert statuses[-1].status_code == 429
+        assert "access-control-allow-origin" in statuses[-1].headers
+        assert "retry-after" in statuses[-1].headers
+
+        missing = client.get("/api/orders", headers={**origin, "Authorization": "Bearer token_nao-existe:1"})
+        assert missing.status_code == 404
+        assert "access-control-allow-origin" in missing.headers
+
+        text = client.get("/api/metrics").text
+        assert 'condoos_http_requests_total{method="POST",route="<other>",status="429"}' in text
@@ -0,0 +1,55 @@
+import asyncio
+import time
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+
+import main
+
+ADMIN = {"Authorization": "Bearer token_1"}
+
+def _wait_ready():
+    while not main.tenants.default.ready:
+        time.sleep(0.01)
+
+def test_escalation_survives_a_second_lifespan():
+    with TestClient(main.app):
+        _wait_ready()
+    with TestClient(main.app) as client:
+        _wait_ready()
+        order = client.post("/api/orders", headers=ADMIN, json={
+            "title": "Infiltração", "description": "Teto da garagem", "category": "hidraulica",
+            "priority": "media", "estimated_completion": (datetime.now() + timedelta(seconds=0.5)).isoformat(),
+        }).json()
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            current = client.get(f"/api/orders/{order['id']}", headers=ADMIN).json()
+            if current["sla_breached_at"]:
+                break
+            time.sleep(0.1)
+        assert current["sla_breached_at"] is not None
+        assert current["priority"] == "alta"
+
+def test_wakeup_from_another_thread():
+    async def scenario():
+        wakeup = main.LoopWakeup()
+        wakeup.bind()
+        await asyncio.to_thread(wakeup.set)
+        await asyncio.wait_for(wakeup.event.wait(), 1)
+
+    asyncio.run(scenario())
+
+def test_forbidden_update_leaves_order_untouched():
+    with TestClient(main.app) as client:
+        _wait_ready()
+        order = client.post("/api/orders", headers=ADMIN, json={
+            "title": "Portão travando", "description": "Portão da garagem", "category": "eletrica",
+            "priority": "media",
+        }).json()
+        response = client.put(f"/api/orders/{order['id']}", headers={"Authorization": "Bearer token_4"},
+                              json={"status": "concluida", "priority": "baixa"})
+        assert response.status_code == 403
+        current = client.get(f"/api/orders/{order['id']}", headers=ADMIN).json()
+        assert current["status"] == order["status"]
+        assert current["priority"] == "media"
+        assert current["completed_at"] is None
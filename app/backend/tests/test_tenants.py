@@ -0,0 +1,91 @@
+import json
+import time
+from datetime import datetime
+
+import pytest
+from click.testing import CliRunner
+from fastapi.testclient import TestClient
+
+import main
+from condoos_admin import cli
+
+@pytest.fixture(scope="module")
+def client():
+    for condo_id, users in (("condo-a", [{
+        "id": "a1", "name": "Admin A", "email": "admin@a.com", "role": "admin",
+        "created_at": str(datetime.now()), "password": "a123", "condo_id": "condo-a",
+    }]), ("condo-vazio", [])):
+        (main.CONDOS_DIR / condo_id).mkdir(parents=True, exist_ok=True)
+        with open(main.CONDOS_DIR / condo_id / "users.json", "w") as f:
+            json.dump(users, f)
+    with TestClient(main.app) as client:
+        while not main.tenants.default.ready:
+            time.sleep(0.01)
+        yield client
+
+def test_condo_login_uses_header_and_scoped_token(client):
+    response = client.post(
+        "/api/auth/login", json={"email": "admin@a.com", "password": "a123"}, headers={"X-Condo-Id": "condo-a"}
+    )
+    assert response.status_code == 200
+    token = response.json()["token"]
+    assert token == "token_condo-a:a1"
+    users = client.get("/api/users", headers={"Authorization": f"Bearer {token}"}).json()
+    assert [u["id"] for u in users] == ["a1"]
+
+def test_unscoped_token_cannot_select_condo(client):
+    response = client.get("/api/users", headers={"Authorization": "Bearer token_1", "X-Condo-Id": "condo-a"})
+    assert response.status_code == 400
+
+def test_condo_partitions_are_not_seeded(client):
+    response = client.post(
+        "/api/auth/login",
+        json={"email": "admin@condo.com", "password": "admin123"},
+        headers={"X-Condo-Id": "condo-vazio"}
+    )
+    assert response.status_code == 401
+    assert not (main.CONDOS_DIR / "condo-vazio" / "orders.json").exists()
+
+def test_create_condo_with_first_admin(client, monkeypatch):
+    monkeypatch.setenv("CONDOOS_DATA_DIR", str(main.DATA_DIR))
+    args = ["--data-dir", str(main.DATA_DIR), "create-condo", "condo-novo",
+            "--admin-email", "admin@novo.com", "--admin-password", "novo123"]
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert CliRunner().invoke(cli, args).exit_code != 0
+
+    response = client.post(
+        "/api/auth/login", json={"email": "admin@novo.com", "password": "novo123"}, headers={"X-Condo-Id": "condo-novo"}
+    )
+    assert response.status_code == 200
+    assert response.json()["token"].startswith("token_condo-novo:")
+    assert response.json()["user"]["role"] == "admin"
+
+def test_admin_cli_reaches_condo_partitions(tmp_path, monkeypatch):
+    data_dir = tmp_path / "data"
+    data_dir.mkdir()
+    monkeypatch.setenv("CONDOOS_DATA_DIR", str(data_dir))
+    runner = CliRunner()
+    result = runner.invoke(cli, ["--data-dir", str(data_dir), "create-condo", "condo-b",
+                                 "--admin-email", "admin@b.com", "--admin-password", "b123"])
+    assert result.exit_code == 0, result.output
+    partition = data_dir / "condos" / "condo-b"
+
+    result = runner.invoke(cli, ["--data-dir", str(partition), "verify"])
+    assert result.exit_code == 2
+    assert "--condo condo-b" in result.output
+
+    result = runner.invoke(cli, ["--data-dir", str(data_dir), "--condo", "condo-b", "verify"])
+    assert result.exit_code == 0, result.output
+    with open(partition / "users.json") as f:
+        assert [u["email"] for u in json.load(f)] == ["admin@b.com"]
+
+    result = runner.invoke(cli, ["--data-dir", str(data_dir), "check", "--jobs", "1",
+                                 "--uploads-dir", str(tmp_path / "uploads")])
+    assert result.exit_code == 0, result.output
+    assert str(partition / "users.json") in result.output
+
+    out = tmp_path / "export"
+    result = runner.invoke(cli, ["--data-dir", str(data_dir), "export", "--out", str(out), "--jobs", "1"])
+    assert result.exit_code == 0, result.output
+    assert (out / "condos" / "condo-b" / "users.jsonl.gz").exists()
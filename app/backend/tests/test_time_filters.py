@@ -0,0 +1,46 @@
+import time
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+
+ADMIN = {"Authorization": "Bearer token_1"}
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(main.app) as client:
+        while not main.tenants.default.ready:
+            time.sleep(0.01)
+        client.post("/api/orders", headers=ADMIN, json={
+            "title": "Lâmpada queimada", "description": "Corredor", "category": "eletrica", "priority": "baixa",
+        })
+        yield client
+
+def test_timezone_aware_filters(client):
+    start = (datetime.now(timezone.utc) - timedelta(hours=1)).isoformat()
+    end = (datetime.now(timezone.utc) + timedelta(hours=1)).isoformat()
+    response = client.get("/api/orders", headers=ADMIN, params={"start_date": start, "end_date": end})
+    assert response.status_code == 200
+    assert any(o["title"] == "Lâmpada queimada" for o in response.json())
+
+    response = client.get("/api/orders", headers=ADMIN, params={"start_date": "2020-01-01T00:00:00Z"})
+    assert response.status_code == 200
+
+    for completed in ("false", "true"):
+        response = client.get("/api/reports/orders-by-period", headers=ADMIN, params={
+            "start_date": "2020-01-01T00:00:00Z", "end_date": end, "completed": completed,
+        })
+        assert response.status_code == 200
+
+    response = client.get("/api/reports/timeseries", headers=ADMIN, params={
+        "start_date": "2026-01-01T00:00:00Z", "end_date": "2026-01-10T00:00:00-03:00",
+    })
+    assert response.status_code == 200
+
+def test_local_naive_converts_to_local_time():
+    aware = datetime(2026, 1, 1, 12, 0, tzinfo=timezone.utc)
+    assert main._local_naive(aware) == aware.astimezone().replace(tzinfo=None)
+    naive = datetime(2026, 1, 1, 12, 0)
+    assert main._local_naive(naive) is naive